@@ -2,11 +2,17 @@
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
+PLATFORMS = [Platform.SENSOR]
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Barcode Router component."""
+    from .websocket import async_setup_websocket
+
+    async_setup_websocket(hass)
     return True
 
 
@@ -22,15 +28,25 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await coordinator.async_config_entry_first_refresh()
     
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     await async_setup_services(hass, entry)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     from .const import DOMAIN
     
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+
     if DOMAIN in hass.data and entry.entry_id in hass.data[DOMAIN]:
         coordinator = hass.data[DOMAIN][entry.entry_id]
         # Properly shutdown coordinator to close aiohttp sessions and clean up resources
@@ -2,8 +2,20 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Callable
+import logging
+import time
 from typing import Any
 
+from ..batch_manager import BatchItem
+
+_LOGGER = logging.getLogger(__name__)
+
+# Called with each item, its result and how long its backend call took in
+# seconds, or None if no call was made
+ResultCallback = Callable[[BatchItem, dict[str, Any], float | None], None]
+
 
 class BackendBase(ABC):
     """Abstract base class for backend adapters."""
@@ -14,7 +26,10 @@ class BackendBase(ABC):
 
     @abstractmethod
     async def check_item_exists(self, barcode: str) -> bool:
-        """Check if an item exists in the backend."""
+        """Check if an item exists in the backend.
+
+        Raises if the backend cannot be asked, rather than returning False.
+        """
         pass
 
     @abstractmethod
@@ -22,11 +37,55 @@ class BackendBase(ABC):
         """Get item information from the backend."""
         pass
 
+    @property
+    def available(self) -> bool:
+        """Return False while the backend is known to be unreachable.
+
+        Items that cannot be checked while the backend is unavailable are
+        queued and retried instead of being reported as errors.
+        """
+        return True
+
+    async def resolve_item(self, barcode: str) -> dict[str, Any] | None:
+        """Resolve a barcode to item information in a single step.
+
+        Returns None if the item does not exist and raises if the backend
+        cannot be asked, so an outage is never taken for a missing item.
+        Backends that can answer both questions with one request should
+        override this.
+        """
+        if not await self.check_item_exists(barcode):
+            return None
+        return await self.get_item_info(barcode)
+
+    async def async_recover_creation(self, item: BatchItem) -> dict[str, Any] | None:
+        """Settle a creation that may have reached the backend before failing.
+
+        Backends whose creations take several requests should override this
+        to finish a partly created item instead of creating it again.
+
+        Returns:
+            The result of the creation if the item exists, or None if the
+            backend positively does not have it and it can be sent again;
+            raises if the backend cannot be asked
+        """
+        if await self.resolve_item(item.scanned_barcode) is None:
+            return None
+        return {"barcode": item.barcode, "success": True, "action": "created_item"}
+
     @abstractmethod
     async def add_quantity(
-        self, barcode: str, quantity: int, **kwargs: Any
+        self,
+        barcode: str,
+        quantity: int,
+        item_info: dict[str, Any] | None = None,
+        **kwargs: Any,
     ) -> bool:
-        """Add quantity to an existing item."""
+        """Add quantity to an existing item.
+
+        item_info is the result of a previous resolve_item call, if available,
+        so the backend does not need to resolve the barcode again.
+        """
         pass
 
     @abstractmethod
@@ -34,6 +93,71 @@ class BackendBase(ABC):
         """Create a new item in the backend."""
         pass
 
+    async def process_item(self, item: BatchItem) -> dict[str, Any]:
+        """Send a single batch item to the backend and return its result."""
+        barcode = item.barcode
+        if item.exists:
+            # Add quantity to existing item
+            if await self.add_quantity(
+                item.scanned_barcode, item.quantity, item_info=item.item_info
+            ):
+                _LOGGER.info("Added quantity %d to item %s", item.quantity, barcode)
+                return {"barcode": barcode, "success": True, "action": "added_quantity"}
+            return {"barcode": barcode, "success": False, "error": "Failed to add quantity"}
+
+        # Create new item
+        if await self.create_item(item_data_for_create(item)):
+            _LOGGER.info("Created new item %s", barcode)
+            return {"barcode": barcode, "success": True, "action": "created_item"}
+        return {"barcode": barcode, "success": False, "error": "Failed to create item"}
+
+    async def process_items(
+        self,
+        items: list[BatchItem],
+        limit: asyncio.Semaphore,
+        on_result: ResultCallback | None = None,
+    ) -> list[dict[str, Any]]:
+        """Process several batch items, returning one result per item in order.
+
+        The default sends each item with process_item, running at most as many
+        at once as limit allows and keeping items with the same barcode in
+        order. Backends that can combine work should override this.
+
+        A failed result may be marked "retryable" if its write provably never
+        reached the backend, so it is queued and sent again, or "uncertain" if
+        a creation may have reached it, so it is only sent again once the
+        backend confirms the item does not exist.
+        """
+        # asyncio.Lock wakes waiters in FIFO order, which keeps per-barcode order
+        barcode_locks: dict[str, asyncio.Lock] = {}
+
+        async def _process(item: BatchItem, barcode_lock: asyncio.Lock) -> dict[str, Any]:
+            async with barcode_lock, limit:
+                started = time.perf_counter()
+                result = await self._async_guarded(self.process_item(item), item.barcode)
+                elapsed = time.perf_counter() - started
+            if on_result:
+                on_result(item, result, elapsed)
+            return result
+
+        return list(
+            await asyncio.gather(
+                *(
+                    _process(item, barcode_locks.setdefault(item.barcode, asyncio.Lock()))
+                    for item in items
+                )
+            )
+        )
+
+    @staticmethod
+    async def _async_guarded(coro: Any, barcode: str) -> dict[str, Any]:
+        """Await a processing coroutine, turning exceptions into a failed result."""
+        try:
+            return await coro
+        except Exception as err:
+            _LOGGER.exception("Error processing item %s: %s", barcode, err)
+            return {"barcode": barcode, "success": False, "error": str(err)}
+
     @abstractmethod
     def get_required_fields(self) -> list[dict[str, str]]:
         """Get list of required fields for creating a new item."""
@@ -43,3 +167,17 @@ class BackendBase(ABC):
     def get_backend_name(self) -> str:
         """Get the name of this backend."""
         pass
+
+
+def item_data_for_create(item: BatchItem) -> dict[str, Any]:
+    """Build the create_item payload for a new batch item."""
+    item_data = {
+        "barcode": item.scanned_barcode,
+        "name": item.upc_data.get("title", "Unknown Item"),
+        "description": item.upc_data.get("description", ""),
+        "quantity": item.quantity,
+    }
+    # Merge pending confirmation data
+    if item.pending_confirmation:
+        item_data.update(item.pending_confirmation)
+    return item_data
@@ -1,157 +1,413 @@
 """Grocy backend adapter."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from typing import Any
 
 import aiohttp
 
-from .base import BackendBase
+from ..barcode import canonicalize_barcode
+from ..batch_manager import BatchItem
+from ..const import (
+    GROCY_CIRCUIT_FAILURE_THRESHOLD,
+    GROCY_CIRCUIT_RESET_TIMEOUT,
+    GROCY_INDEX_MAX_AGE,
+    GROCY_INDEX_MISS_MAX_AGE,
+    GROCY_RETRY_ATTEMPTS,
+    GROCY_RETRY_BASE_DELAY,
+    GROCY_RETRY_MAX_DELAY,
+    HTTP_REQUEST_TIMEOUT,
+)
+from ..http_session import HttpSessionManager
+from ..metrics import Metrics
+from ..resilience import STATE_CLOSED, CircuitBreaker, CircuitOpenError, backoff_delay
+from ..singleflight import SingleFlight
+from .base import BackendBase, ResultCallback, item_data_for_create
 
 _LOGGER = logging.getLogger(__name__)
 
+# Requests that can be repeated without booking anything twice
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+
+def _is_transient(err: Exception) -> bool:
+    """Return whether an error means Grocy is unreachable or overloaded."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status >= 500 or err.status == 429
+    return True
+
+
+def _is_retryable(err: Exception) -> bool:
+    """Return whether a request is worth repeating at once.
+
+    Refused connections and 5xx/429 answers fail fast, so retrying them is
+    cheap. A timeout has already waited the full request timeout and is left
+    to the circuit breaker instead.
+    """
+    if isinstance(err, asyncio.TimeoutError):
+        return False
+    return _is_transient(err)
+
+
+def _never_sent(err: Exception) -> bool:
+    """Return whether a request failed before it could reach Grocy."""
+    return isinstance(err, (CircuitOpenError, aiohttp.ClientConnectorError))
+
+
+def _is_unreachable(err: Exception) -> bool:
+    """Return whether an error means Grocy could not be asked at all."""
+    if isinstance(err, CircuitOpenError):
+        return True
+    return isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError)) and _is_transient(err)
+
+
+class PartialCreationError(Exception):
+    """Raised when a product was created but linking or stocking it failed."""
+
+    def __init__(self, product_id: Any, err: Exception) -> None:
+        """Initialize the error."""
+        super().__init__(f"Created product {product_id} but could not finish it: {err}")
+        self.product_id = product_id
+
 
 class GrocyBackend(BackendBase):
     """Grocy backend adapter."""
 
-    def __init__(self, config: dict[str, Any]) -> None:
+    def __init__(
+        self,
+        config: dict[str, Any],
+        session_manager: HttpSessionManager,
+        metrics: Metrics | None = None,
+    ) -> None:
         """Initialize Grocy backend."""
         super().__init__(config)
         self.url = config.get("url", "").rstrip("/")
         self.api_key = config.get("api_key", "")
-        self._session: aiohttp.ClientSession | None = None
+        self._session_manager = session_manager
+        self._metrics = metrics
+        self._product_lookups = SingleFlight()
+        self.circuit_breaker = CircuitBreaker(
+            "Grocy", GROCY_CIRCUIT_FAILURE_THRESHOLD, GROCY_CIRCUIT_RESET_TIMEOUT
+        )
 
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
+        # Local mirror of Grocy products, keyed by product id and by barcode
+        self._products: dict[int, dict[str, Any]] = {}
+        self._barcodes: dict[str, int] = {}
+        self._product_names: dict[str, int] = {}
+        self._unit_names: dict[int, str] = {}
+        self._index_changed_time: str | None = None
+        self._index_checked: float | None = None
+        self._index_lock = asyncio.Lock()
 
     async def _request(
         self, method: str, endpoint: str, **kwargs: Any
-    ) -> dict[str, Any] | None:
-        """Make a request to Grocy API."""
-        session = await self._get_session()
+    ) -> Any:
+        """Make a request to Grocy API.
+
+        Idempotent requests are retried with jittered backoff on connection
+        errors and 5xx/429 responses; timeouts are not retried. All requests
+        go through the circuit breaker, so while Grocy is down they fail at
+        once.
+        """
+        attempts = GROCY_RETRY_ATTEMPTS if method in IDEMPOTENT_METHODS else 1
+        for attempt in range(attempts):
+            self.circuit_breaker.before_call()
+            started = time.perf_counter()
+            try:
+                result = await self._send(method, endpoint, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if not _is_transient(err):
+                    # Grocy answered, it just did not like the request
+                    self.circuit_breaker.record_success()
+                    self._record_request(started, error=True)
+                    _LOGGER.error("Grocy API error: %s", err)
+                    raise
+                self.circuit_breaker.record_failure()
+                self._record_request(started, error=True)
+                if (
+                    attempt + 1 >= attempts
+                    or not _is_retryable(err)
+                    or self.circuit_breaker.state != STATE_CLOSED
+                ):
+                    _LOGGER.error("Grocy API error: %s", err)
+                    raise
+                delay = backoff_delay(attempt, GROCY_RETRY_BASE_DELAY, GROCY_RETRY_MAX_DELAY)
+                _LOGGER.debug("Retrying %s %s in %.2fs: %s", method, endpoint, delay, err)
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                self._record_request(started)
+                return result
+
+    def _record_request(self, started: float, error: bool = False) -> None:
+        """Record the latency of one request attempt."""
+        if self._metrics is not None:
+            self._metrics.record("request.grocy", time.perf_counter() - started, error)
+
+    async def _send(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        """Send one request to Grocy API."""
+        session = self._session_manager.session
         headers = {"GROCY-API-KEY": self.api_key, "Content-Type": "application/json"}
         url = f"{self.url}/api{endpoint}"
 
-        try:
-            async with session.request(
-                method, url, headers=headers, timeout=aiohttp.ClientTimeout(total=10), **kwargs
-            ) as response:
-                if response.status == 404:
-                    return None
-                response.raise_for_status()
-                if response.content_type == "application/json":
-                    return await response.json()
+        async with session.request(
+            method, url, headers=headers, timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT), **kwargs
+        ) as response:
+            if response.status == 404:
                 return None
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Grocy API error: %s", err)
-            raise
+            response.raise_for_status()
+            if response.content_type == "application/json":
+                return await response.json()
+            return None
+
+    @property
+    def available(self) -> bool:
+        """Return False while Grocy requests are failing."""
+        return self.circuit_breaker.healthy
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return backend statistics."""
+        return {"circuit_breaker": self.circuit_breaker.stats}
+
+    async def _get_product_by_barcode(self, barcode: str) -> dict[str, Any] | None:
+        """Get the product for a barcode, sharing concurrent requests for it."""
+        return await self._product_lookups.async_run(
+            barcode,
+            lambda: self._request("GET", f"/objects/products/by-barcode/{barcode}"),
+        )
+
+    async def _async_sync_index(self, max_age: float) -> bool:
+        """Bring the local product index up to date.
+
+        Grocy's database change time is polled at most once every ``max_age``
+        seconds, and products are only reloaded when it has changed.
+
+        Returns:
+            True if the index is usable, False if Grocy answered but the index
+            could not be loaded from it
+
+        Raises:
+            CircuitOpenError, aiohttp.ClientError, asyncio.TimeoutError: Grocy
+                is unreachable, so the API fallback would fail as well
+        """
+        if (
+            self._index_checked is not None
+            and time.monotonic() - self._index_checked < max_age
+        ):
+            return True
+
+        async with self._index_lock:
+            # Another caller may have synced while we waited for the lock
+            if (
+                self._index_checked is not None
+                and time.monotonic() - self._index_checked < max_age
+            ):
+                return True
+
+            try:
+                changed = await self._request("GET", "/system/db-changed-time")
+                changed_time = (changed or {}).get("changed_time")
+                if changed_time is None or changed_time != self._index_changed_time:
+                    products, barcodes, units = await asyncio.gather(
+                        self._request("GET", "/objects/products"),
+                        self._request("GET", "/objects/product_barcodes"),
+                        self._request("GET", "/objects/quantity_units"),
+                    )
+                    self._products = {int(p["id"]): p for p in products or []}
+                    self._product_names = {
+                        str(p.get("name")): product_id for product_id, p in self._products.items()
+                    }
+                    # Keyed by canonical form so UPC-A and EAN-13 scans both match
+                    self._barcodes = {}
+                    for entry in barcodes or []:
+                        code = str(entry.get("barcode") or "")
+                        if code:
+                            key = canonicalize_barcode(code) or code
+                            self._barcodes[key] = int(entry["product_id"])
+                    self._unit_names = {int(u["id"]): u.get("name") for u in units or []}
+                    self._index_changed_time = changed_time
+                    _LOGGER.debug(
+                        "Synced Grocy index: %d products, %d barcodes",
+                        len(self._products),
+                        len(self._barcodes),
+                    )
+            except Exception as err:
+                self._index_checked = None
+                if _is_unreachable(err):
+                    raise
+                _LOGGER.warning("Could not sync Grocy product index: %s", err)
+                return False
+
+            self._index_checked = time.monotonic()
+            return True
+
+    async def _async_find_product(self, barcode: str) -> dict[str, Any] | None:
+        """Resolve a barcode to a Grocy product.
+
+        Uses the local index, falling back to the API when the index cannot be
+        loaded. A miss re-checks Grocy's change time with a shorter max age so
+        products created outside the integration are picked up quickly.
+
+        Args:
+            barcode: Barcode as scanned; the index matches any GTIN form of it,
+                the API fallback only the form Grocy stores
+
+        Returns:
+            The product, or None if Grocy has no product for the barcode;
+            errors are raised, never reported as a missing product
+        """
+        if not await self._async_sync_index(GROCY_INDEX_MAX_AGE):
+            return await self._get_product_by_barcode(barcode)
+
+        key = canonicalize_barcode(barcode) or barcode
+        product_id = self._barcodes.get(key)
+        if product_id is None:
+            if not await self._async_sync_index(GROCY_INDEX_MISS_MAX_AGE):
+                return await self._get_product_by_barcode(barcode)
+            product_id = self._barcodes.get(key)
+
+        return self._products.get(product_id) if product_id is not None else None
+
+    async def _async_find_product_by_name(self, name: str) -> dict[str, Any] | None:
+        """Find a product by its exact name, raising if Grocy cannot be asked."""
+        if await self._async_sync_index(GROCY_INDEX_MISS_MAX_AGE):
+            product_id = self._product_names.get(name)
+            return self._products.get(product_id) if product_id is not None else None
+        products = await self._request(
+            "GET", "/objects/products", params={"query[]": f"name={name}"}
+        )
+        return next(iter(products or []), None)
+
+    def _index_product(self, product: dict[str, Any], barcode: str | None) -> None:
+        """Add a product created by this integration to the local index."""
+        product_id = int(product["id"])
+        self._products[product_id] = product
+        self._product_names[str(product.get("name"))] = product_id
+        if barcode:
+            self._barcodes[canonicalize_barcode(barcode) or barcode] = product_id
 
     async def check_item_exists(self, barcode: str) -> bool:
         """Check if an item exists in Grocy."""
-        try:
-            result = await self._request("GET", f"/objects/products/by-barcode/{barcode}")
-            return result is not None
-        except Exception as err:
-            _LOGGER.error("Error checking item existence: %s", err)
-            return False
+        return await self._async_find_product(barcode) is not None
+
+    async def resolve_item(self, barcode: str) -> dict[str, Any] | None:
+        """Resolve a barcode to Grocy product information."""
+        product = await self._async_find_product(barcode)
+        if product is None:
+            return None
+
+        unit_id = product.get("qu_id_purchase")
+        return {
+            "id": product.get("id"),
+            "name": product.get("name"),
+            "description": product.get("description"),
+            "barcode": barcode,
+            "unit": self._unit_names.get(int(unit_id)) if unit_id else None,
+        }
 
     async def get_item_info(self, barcode: str) -> dict[str, Any] | None:
         """Get item information from Grocy."""
-        try:
-            product = await self._request("GET", f"/objects/products/by-barcode/{barcode}")
-            if product is None:
-                return None
+        return await self.resolve_item(barcode)
 
-            # Get product details
-            product_id = product.get("id")
-            if product_id:
-                product_details = await self._request("GET", f"/objects/products/{product_id}")
-                if product_details:
-                    return {
-                        "id": product_details.get("id"),
-                        "name": product_details.get("name"),
-                        "description": product_details.get("description"),
-                        "barcode": barcode,
-                        "unit": product_details.get("qu_unit_purchase", {}).get("name"),
-                    }
-            return product
-        except Exception as err:
-            _LOGGER.error("Error getting item info: %s", err)
-            return None
+    async def _add_stock(self, endpoint: str, quantity: int, **kwargs: Any) -> bool:
+        """Book a purchase of quantity against a stock endpoint."""
+        booking_data = {
+            "amount": quantity,
+            "transaction_type": "purchase",
+        }
+
+        # Add optional fields if provided
+        for field in ("best_before_date", "purchased_date", "price", "shopping_location_id"):
+            if kwargs.get(field) is not None:
+                booking_data[field] = kwargs[field]
+
+        result = await self._request("POST", endpoint, json=booking_data)
+        return result is not None
 
     async def add_quantity(
-        self, barcode: str, quantity: int, **kwargs: Any
+        self,
+        barcode: str,
+        quantity: int,
+        item_info: dict[str, Any] | None = None,
+        **kwargs: Any,
     ) -> bool:
         """Add quantity to an existing item in Grocy."""
         try:
-            # Get product by barcode
-            product = await self._request("GET", f"/objects/products/by-barcode/{barcode}")
-            if product is None:
-                _LOGGER.error("Product not found for barcode: %s", barcode)
-                return False
-
-            product_id = product.get("id")
-            if not product_id:
-                _LOGGER.error("Product ID not found for barcode: %s", barcode)
-                return False
-
-            # Prepare booking data
-            booking_data = {
-                "amount": quantity,
-                "product_id": product_id,
-            }
-
-            # Add optional fields if provided
-            if "best_before_date" in kwargs:
-                booking_data["best_before_date"] = kwargs["best_before_date"]
-            if "purchased_date" in kwargs:
-                booking_data["purchased_date"] = kwargs["purchased_date"]
-            if "price" in kwargs:
-                booking_data["price"] = kwargs["price"]
-            if "shopping_location_id" in kwargs:
-                booking_data["shopping_location_id"] = kwargs["shopping_location_id"]
-
-            result = await self._request("POST", "/stock/bookin", json=booking_data)
-            return result is not None
+            return await self._async_book(barcode, quantity, item_info, **kwargs)
         except Exception as err:
             _LOGGER.error("Error adding quantity: %s", err)
             return False
 
+    async def _async_book(
+        self,
+        barcode: str,
+        quantity: int,
+        item_info: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> bool:
+        """Book quantity against an existing product, raising request errors."""
+        product_id = (item_info or {}).get("id")
+        if product_id:
+            endpoint = f"/stock/products/{product_id}/add"
+        else:
+            # Let Grocy resolve the barcode instead of looking it up first
+            endpoint = f"/stock/products/by-barcode/{barcode}/add"
+        return await self._add_stock(endpoint, quantity, **kwargs)
+
     async def create_item(self, item_data: dict[str, Any]) -> bool:
         """Create a new item in Grocy."""
         try:
-            # Prepare product data
-            product_data = {
-                "name": item_data.get("name", ""),
-                "description": item_data.get("description", ""),
-            }
+            await self._async_create_product(item_data)
+        except Exception as err:
+            _LOGGER.error("Error creating item: %s", err)
+            return False
+        return True
 
-            # Add optional fields
-            if "qu_id_purchase" in item_data:
-                product_data["qu_id_purchase"] = item_data["qu_id_purchase"]
-            if "qu_id_stock" in item_data:
-                product_data["qu_id_stock"] = item_data["qu_id_stock"]
-            if "qu_factor_purchase_to_stock" in item_data:
-                product_data["qu_factor_purchase_to_stock"] = item_data["qu_factor_purchase_to_stock"]
-            if "location_id" in item_data:
-                product_data["location_id"] = item_data["location_id"]
-            if "shopping_location_id" in item_data:
-                product_data["shopping_location_id"] = item_data["shopping_location_id"]
-
-            # Create product
-            product = await self._request("POST", "/objects/products", json=product_data)
-            if product is None:
-                return False
+    async def _async_create_product(self, item_data: dict[str, Any]) -> None:
+        """Create a product, link its barcode and book its initial stock.
 
-            product_id = product.get("id")
-            if not product_id:
-                return False
+        Raises:
+            PartialCreationError: The product was created but a later step
+                failed, so creating it again would make a duplicate
+        """
+        # Prepare product data
+        product_data = {
+            "name": item_data.get("name", ""),
+            "description": item_data.get("description", ""),
+        }
+
+        # Add optional fields
+        for field in (
+            "qu_id_purchase",
+            "qu_id_stock",
+            "qu_factor_purchase_to_stock",
+            "location_id",
+            "shopping_location_id",
+        ):
+            if field in item_data:
+                product_data[field] = item_data[field]
 
+        # Create product
+        product = await self._request("POST", "/objects/products", json=product_data)
+        product_id = (product or {}).get("created_object_id") or (product or {}).get("id")
+        if not product_id:
+            raise ValueError("Grocy did not return the new product")
+
+        self._index_product({**product_data, "id": product_id}, item_data.get("barcode"))
+        await self._async_finish_product(product_id, item_data)
+
+    async def _async_finish_product(self, product_id: Any, item_data: dict[str, Any]) -> None:
+        """Link the barcode of a created product and book its initial stock.
+
+        Raises:
+            PartialCreationError: Either step failed
+        """
+        barcode = item_data.get("barcode")
+        try:
             # Link barcode to product
-            barcode = item_data.get("barcode")
             if barcode:
                 barcode_data = {
                     "product_id": product_id,
@@ -159,19 +415,170 @@ class GrocyBackend(BackendBase):
                 }
                 await self._request("POST", "/objects/product_barcodes", json=barcode_data)
 
-            # If quantity is provided, add initial stock
-            if "quantity" in item_data and item_data["quantity"] > 0:
-                await self.add_quantity(
-                    barcode,
-                    item_data["quantity"],
-                    best_before_date=item_data.get("best_before_date"),
-                    purchased_date=item_data.get("purchased_date"),
-                )
+            # If quantity is provided, add initial stock to the product just created
+            if item_data.get("quantity", 0) > 0 and not await self._add_stock(
+                f"/stock/products/{product_id}/add",
+                item_data["quantity"],
+                best_before_date=item_data.get("best_before_date"),
+                purchased_date=item_data.get("purchased_date"),
+                price=item_data.get("price"),
+            ):
+                raise ValueError("Grocy did not confirm the initial stock")
+        except Exception as err:
+            raise PartialCreationError(product_id, err) from err
 
-            return True
+    async def async_recover_creation(self, item: BatchItem) -> dict[str, Any] | None:
+        """Settle a creation that may have reached Grocy before failing.
+
+        The product POST and the barcode link are separate requests, so a
+        product POST that timed out after Grocy created the product leaves it
+        without its barcode. Such a product is found by name and finished,
+        instead of being created a second time.
+        """
+        item_data = item_data_for_create(item)
+        # Look at Grocy as it is now, not as last indexed
+        await self._async_sync_index(0)
+        if await self._async_find_product(item.scanned_barcode) is not None:
+            return {"barcode": item.barcode, "success": True, "action": "created_item"}
+
+        product = await self._async_find_product_by_name(str(item_data.get("name") or ""))
+        if product is None:
+            return None
+
+        product_id = product.get("id")
+        self._index_product(product, item_data.get("barcode"))
+        try:
+            await self._async_finish_product(product_id, item_data)
+        except PartialCreationError as err:
+            _LOGGER.error("Error finishing item %s: %s", item.barcode, err)
+            return {
+                "barcode": item.barcode,
+                "success": False,
+                "error": f"{err}; check the product in Grocy before processing again",
+            }
+        _LOGGER.info("Finished product %s created for item %s", product_id, item.barcode)
+        return {"barcode": item.barcode, "success": True, "action": "created_item"}
+
+    async def process_items(
+        self,
+        items: list[BatchItem],
+        limit: asyncio.Semaphore,
+        on_result: ResultCallback | None = None,
+    ) -> list[dict[str, Any]]:
+        """Process batch items, combining work for the same product.
+
+        Existing items that resolve to the same product are booked once with
+        their summed quantity. New items are only combined when they share a
+        barcode. Grocy product names are unique, so when new items with
+        different barcodes share a name, only the first is created and the
+        others are reported as conflicts to be renamed.
+        """
+        bookings: dict[Any, list[BatchItem]] = {}
+        creations: dict[str, list[BatchItem]] = {}
+        conflicts: list[BatchItem] = []
+        names: set[str] = set()
+        for item in items:
+            if item.exists:
+                key = (item.item_info or {}).get("id") or item.barcode
+                bookings.setdefault(key, []).append(item)
+            elif item.barcode in creations:
+                creations[item.barcode].append(item)
+            else:
+                name = str(item_data_for_create(item).get("name") or "").strip().lower()
+                if name and name != "unknown item":
+                    if name in names:
+                        conflicts.append(item)
+                        continue
+                    names.add(name)
+                creations[item.barcode] = [item]
+
+        results: dict[int, dict[str, Any]] = {}
+        for item in conflicts:
+            results[id(item)] = {
+                "barcode": item.barcode,
+                "success": False,
+                "error": "Another new item in the batch has the same name; rename it",
+            }
+            if on_result:
+                on_result(item, results[id(item)], None)
+
+        async def _run(group: list[BatchItem], create: bool) -> None:
+            async with limit:
+                if create:
+                    coro = self._async_process_creation(group)
+                else:
+                    coro = self._async_process_booking(group)
+                started = time.perf_counter()
+                result = await self._async_guarded(coro, group[0].barcode)
+                elapsed = time.perf_counter() - started
+
+            for item in group:
+                item_result = {**result, "barcode": item.barcode}
+                if len(group) > 1:
+                    item_result["combined_with"] = len(group) - 1
+                results[id(item)] = item_result
+                if on_result:
+                    on_result(item, item_result, elapsed)
+
+        await asyncio.gather(
+            *(_run(group, False) for group in bookings.values()),
+            *(_run(group, True) for group in creations.values()),
+        )
+        return [results[id(item)] for item in items]
+
+    async def _async_process_booking(self, group: list[BatchItem]) -> dict[str, Any]:
+        """Book the summed quantity of items that share a product."""
+        first = group[0]
+        quantity = sum(item.quantity for item in group)
+        try:
+            booked = await self._async_book(first.scanned_barcode, quantity, first.item_info)
         except Exception as err:
-            _LOGGER.error("Error creating item: %s", err)
-            return False
+            _LOGGER.error("Error adding quantity to %s: %s", first.barcode, err)
+            result = {
+                "barcode": first.barcode,
+                "success": False,
+                "error": f"Failed to add quantity: {err}",
+            }
+            if _never_sent(err):
+                result["retryable"] = True
+            elif _is_unreachable(err):
+                # Grocy may have booked it, so it must not be sent again blindly
+                result["error"] = f"May have been booked; check the stock before processing again: {err}"
+            return result
+        if booked:
+            _LOGGER.info("Added quantity %d to item %s", quantity, first.barcode)
+            return {"barcode": first.barcode, "success": True, "action": "added_quantity"}
+        return {"barcode": first.barcode, "success": False, "error": "Failed to add quantity"}
+
+    async def _async_process_creation(self, group: list[BatchItem]) -> dict[str, Any]:
+        """Create one product for new items that share a barcode."""
+        first = group[0]
+        item_data = item_data_for_create(first)
+        item_data["quantity"] = sum(item.quantity for item in group)
+        try:
+            await self._async_create_product(item_data)
+        except PartialCreationError as err:
+            _LOGGER.error("Error creating item %s: %s", first.barcode, err)
+            return {
+                "barcode": first.barcode,
+                "success": False,
+                "error": f"{err}; check the product in Grocy before processing again",
+            }
+        except Exception as err:
+            _LOGGER.error("Error creating item %s: %s", first.barcode, err)
+            result = {
+                "barcode": first.barcode,
+                "success": False,
+                "error": f"Failed to create item: {err}",
+            }
+            if _never_sent(err):
+                result["retryable"] = True
+            elif _is_unreachable(err):
+                # Grocy may have created it; the outbox checks before sending it again
+                result["uncertain"] = True
+            return result
+        _LOGGER.info("Created new item %s", first.barcode)
+        return {"barcode": first.barcode, "success": True, "action": "created_item"}
 
     def get_required_fields(self) -> list[dict[str, str]]:
         """Get list of required fields for creating a new item in Grocy."""
@@ -186,8 +593,3 @@ class GrocyBackend(BackendBase):
     def get_backend_name(self) -> str:
         """Get the name of this backend."""
         return "Grocy"
-
-    async def close(self) -> None:
-        """Close the session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
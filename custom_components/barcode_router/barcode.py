@@ -0,0 +1,44 @@
+"""Barcode validation and canonicalization."""
+from __future__ import annotations
+
+# Lengths of GTIN barcodes: EAN-8, UPC-A, EAN-13 and GTIN-14
+GTIN_LENGTHS = frozenset({8, 12, 13, 14})
+
+
+def gtin_check_digit_valid(digits: str) -> bool:
+    """Return whether the last digit of a GTIN is its GS1 check digit."""
+    total = 0
+    # Weights alternate 3, 1, ... starting from the digit next to the check digit
+    for position, digit in enumerate(reversed(digits[:-1])):
+        total += int(digit) * (3 if position % 2 == 0 else 1)
+    return (10 - total % 10) % 10 == int(digits[-1])
+
+
+def canonicalize_barcode(barcode: str) -> str | None:
+    """Return the canonical key for a scanned barcode.
+
+    Scanners report the same product as UPC-A, EAN-13 with a leading zero or
+    GTIN-14, so GTINs are reduced to one form: UPC-A gains a leading zero and
+    a GTIN-14 with indicator digit 0 loses it, giving EAN-13. EAN-8 and
+    GTIN-14 with another indicator digit are kept as they are. Barcodes that
+    are not GTINs, e.g. in-house Code 128 labels, are only stripped.
+
+    Args:
+        barcode: Barcode as read by the scanner
+
+    Returns:
+        Canonical barcode, or None if it is empty or a GTIN whose check digit
+        does not match (a misread)
+    """
+    barcode = barcode.strip()
+    digits = barcode.replace(" ", "").replace("-", "")
+    if not digits.isdigit() or len(digits) not in GTIN_LENGTHS:
+        return barcode or None
+    if not gtin_check_digit_valid(digits):
+        return None
+
+    if len(digits) == 12:
+        return f"0{digits}"
+    if len(digits) == 14 and digits[0] == "0":
+        return digits[1:]
+    return digits
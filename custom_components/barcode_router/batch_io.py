@@ -0,0 +1,344 @@
+"""Streaming import and export of batches."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import csv
+import itertools
+import json
+import logging
+import os
+from typing import IO, TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from .barcode import canonicalize_barcode
+from .const import (
+    DEFAULT_QUANTITY,
+    DEFAULT_TRANSFER_CHUNK_SIZE,
+    IMPORT_CHECKPOINT_STORAGE_KEY,
+    IMPORT_CHECKPOINT_STORAGE_VERSION,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import BarcodeRouterCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_EXPORT_FIELDS = [
+    "barcode",
+    "scanned_barcode",
+    "name",
+    "quantity",
+    "backend",
+    "exists",
+    "status",
+    "error_message",
+]
+RESULT_EXPORT_FIELDS = ["barcode", "success", "action", "error", "combined_with"]
+TRANSFER_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Raised by opening or reading a file that is missing, unreadable or malformed
+READ_ERRORS = (OSError, csv.Error, UnicodeDecodeError, ValueError)
+
+
+class TransferError(HomeAssistantError):
+    """Error to indicate a batch file cannot be read or written."""
+
+
+def resolve_config_path(
+    hass: HomeAssistant, filename: str, formats: dict[str, str] = TRANSFER_FORMATS
+) -> tuple[str, str]:
+    """Resolve a file name inside the config directory and detect its format.
+
+    Args:
+        hass: Home Assistant instance
+        filename: File name relative to the config directory
+        formats: Accepted file name suffixes and the format of each
+
+    Returns:
+        Tuple of absolute path and format ("csv" or "ndjson")
+    """
+    config_dir = os.path.realpath(hass.config.config_dir)
+    path = os.path.realpath(os.path.join(config_dir, filename))
+    if not path.startswith(config_dir + os.sep):
+        raise TransferError(f"{filename} is outside the configuration directory")
+
+    for suffix, file_format in formats.items():
+        if path.lower().endswith(suffix):
+            return path, file_format
+    raise TransferError(f"Unsupported file type for {filename}, use {', '.join(formats)}")
+
+
+class _RowReader:
+    """Reads rows from a CSV or NDJSON file a chunk at a time.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, path: str, file_format: str) -> None:
+        """Open the file."""
+        self._file: IO[str] = open(path, encoding="utf-8", newline="")
+        self._rows: Iterator[dict[str, Any]] = (
+            csv.DictReader(self._file) if file_format == "csv" else self._iter_ndjson()
+        )
+
+    def _iter_ndjson(self) -> Iterator[dict[str, Any]]:
+        """Yield one record per non-empty line, and an empty one if it is invalid."""
+        for line_number, line in enumerate(self._file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                _LOGGER.warning("Skipping unreadable line %d", line_number)
+                record = {}
+            yield record
+
+    def skip(self, count: int) -> None:
+        """Skip rows that were imported before."""
+        for _ in itertools.islice(self._rows, count):
+            pass
+
+    def read_chunk(self, size: int) -> list[dict[str, Any]]:
+        """Read up to size rows."""
+        return list(itertools.islice(self._rows, size))
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _RowWriter:
+    """Writes rows to a temporary file that replaces the target on close.
+
+    All methods do blocking I/O and must run in the executor.
+    """
+
+    def __init__(self, path: str, file_format: str, fields: list[str]) -> None:
+        """Open the temporary file."""
+        self._path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file: IO[str] = open(self._tmp_path, "w", encoding="utf-8", newline="")
+        self._csv: csv.DictWriter | None = None
+        if file_format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=fields, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write_chunk(self, rows: list[Any]) -> None:
+        """Write CSV row dicts or pre-serialized NDJSON lines."""
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.write("".join(f"{line}\n" for line in rows))
+
+    def close(self) -> None:
+        """Finish the file and move it into place."""
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+
+    def abort(self) -> None:
+        """Discard the temporary file, leaving the target untouched."""
+        with contextlib.suppress(OSError):
+            self._file.close()
+        with contextlib.suppress(OSError):
+            os.remove(self._tmp_path)
+
+
+def _rows_to_scans(rows: list[dict[str, Any]]) -> tuple[dict[str, dict[str, Any]], int]:
+    """Turn imported rows into scans, merging repeated barcodes.
+
+    Returns:
+        Tuple of the scans and the number of rows skipped as invalid
+    """
+    scans: dict[str, dict[str, Any]] = {}
+    invalid = 0
+    for row in rows:
+        raw_barcode = str(row.get("barcode") or "").strip()
+        if not raw_barcode:
+            invalid += 1
+            continue
+        barcode = canonicalize_barcode(raw_barcode)
+        if barcode is None:
+            _LOGGER.warning("Skipping invalid barcode %s", raw_barcode)
+            invalid += 1
+            continue
+        try:
+            quantity = int(row.get("quantity") or DEFAULT_QUANTITY)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Skipping %s: invalid quantity %s", barcode, row.get("quantity"))
+            invalid += 1
+            continue
+
+        scan = scans.setdefault(
+            barcode,
+            {
+                "quantity": 0,
+                "backend": row.get("backend") or None,
+                "scanned_barcode": str(row.get("scanned_barcode") or raw_barcode).strip(),
+            },
+        )
+        scan["quantity"] += quantity
+        if row.get("name"):
+            scan["upc_data"] = {
+                "barcode": barcode,
+                "title": row["name"],
+                "description": row.get("description") or "",
+                "category": row.get("category") or "",
+            }
+    return scans, invalid
+
+
+async def async_import_batch(
+    hass: HomeAssistant,
+    coordinator: BarcodeRouterCoordinator,
+    filename: str,
+    lookup: bool = False,
+    chunk_size: int = DEFAULT_TRANSFER_CHUNK_SIZE,
+    restart: bool = False,
+) -> int:
+    """Stream barcodes from a CSV or NDJSON file into the batch.
+
+    The file is read chunk_size rows at a time and the next chunk is only read
+    once the previous one has been merged into the batch. Before a chunk is
+    merged, the checkpoint records its rows together with the quantities it
+    brings its items to. Importing the same unchanged file again resumes from
+    that chunk unless restart is set. The chunk's items are set to the recorded
+    quantities, so a chunk that was merged just before a crash is not added
+    twice.
+
+    Returns:
+        Number of barcodes added to the batch
+    """
+    path, file_format = resolve_config_path(hass, filename)
+
+    async def _read(target: Any, *args: Any) -> Any:
+        # Blocking reads run in the executor; their failures reach the caller as TransferError
+        try:
+            return await hass.async_add_executor_job(target, *args)
+        except READ_ERRORS as err:
+            raise TransferError(f"Cannot read {filename}: {err}") from err
+
+    stat = await _read(os.stat, path)
+
+    store = Store(hass, IMPORT_CHECKPOINT_STORAGE_VERSION, IMPORT_CHECKPOINT_STORAGE_KEY)
+    checkpoints: dict[str, dict[str, Any]] = await store.async_load() or {}
+    checkpoint = checkpoints.get(path)
+    start = 0
+    if (
+        checkpoint
+        and not restart
+        and checkpoint.get("size") == stat.st_size
+        and checkpoint.get("mtime") == stat.st_mtime
+    ):
+        start = checkpoint.get("rows", 0)
+        _LOGGER.info("Resuming import of %s after %d rows", filename, start)
+    else:
+        checkpoint = None
+
+    reader = await _read(_RowReader, path, file_format)
+    rows_done = start
+    imported = 0
+    invalid = 0
+    try:
+        if start:
+            await _read(reader.skip, start)
+        # The chunk that was being merged when the last import stopped
+        pending = (checkpoint or {}).get("pending")
+        while rows := await _read(reader.read_chunk, pending["rows"] if pending else chunk_size):
+            scans, skipped = _rows_to_scans(rows)
+            invalid += skipped
+            if pending:
+                quantities = pending["quantities"]
+                pending = None
+            else:
+                quantities = {
+                    barcode: scan["quantity"] + _batch_quantity(coordinator, barcode)
+                    for barcode, scan in scans.items()
+                }
+                checkpoints[path] = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "rows": rows_done,
+                    "pending": {"rows": len(rows), "quantities": quantities},
+                }
+                await store.async_save(checkpoints)
+            for barcode, scan in scans.items():
+                scan["quantity"] = quantities.get(barcode, scan["quantity"])
+
+            imported += await coordinator.async_add_scans(scans, lookup=lookup)
+            rows_done += len(rows)
+            _LOGGER.debug("Imported %d rows from %s", rows_done, filename)
+    finally:
+        await hass.async_add_executor_job(reader.close)
+
+    checkpoints.pop(path, None)
+    await store.async_save(checkpoints)
+    _LOGGER.info(
+        "Imported %d barcodes from %d rows of %s, skipped %d invalid rows",
+        imported,
+        rows_done,
+        filename,
+        invalid,
+    )
+    return imported
+
+
+def _batch_quantity(coordinator: BarcodeRouterCoordinator, barcode: str) -> int:
+    """Return the quantity of a barcode already in the batch."""
+    item = coordinator.batch_manager.get_item(barcode)
+    return item.quantity if item is not None else 0
+
+
+async def async_export_batch(
+    hass: HomeAssistant,
+    coordinator: BarcodeRouterCoordinator,
+    filename: str,
+    source: str = "batch",
+    chunk_size: int = DEFAULT_TRANSFER_CHUNK_SIZE,
+) -> int:
+    """Write the batch or the last processing results to a CSV or NDJSON file.
+
+    Rows are serialized a chunk at a time on the event loop and written by the
+    executor, so the file is never built in memory as a whole.
+
+    Returns:
+        Number of rows written
+    """
+    path, file_format = resolve_config_path(hass, filename)
+    if source == "results":
+        records = list(coordinator.last_results)
+        fields = RESULT_EXPORT_FIELDS
+    else:
+        records = [item.to_dict() for item in coordinator.batch_manager.get_items()]
+        fields = BATCH_EXPORT_FIELDS
+
+    try:
+        writer = await hass.async_add_executor_job(_RowWriter, path, file_format, fields)
+    except OSError as err:
+        raise TransferError(f"Cannot write {filename}: {err}") from err
+
+    try:
+        for offset in range(0, len(records), chunk_size):
+            chunk = records[offset : offset + chunk_size]
+            if file_format == "csv":
+                rows: list[Any] = [
+                    {**record, "name": (record.get("upc_data") or {}).get("title", "")}
+                    for record in chunk
+                ]
+            else:
+                rows = [json.dumps(record, separators=(",", ":")) for record in chunk]
+            await hass.async_add_executor_job(writer.write_chunk, rows)
+        await hass.async_add_executor_job(writer.close)
+    except Exception as err:
+        await hass.async_add_executor_job(writer.abort)
+        if isinstance(err, OSError):
+            raise TransferError(f"Cannot write {filename}: {err}") from err
+        raise
+
+    _LOGGER.info("Exported %d %s rows to %s", len(records), source, filename)
+    return len(records)
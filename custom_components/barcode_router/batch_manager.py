@@ -1,13 +1,28 @@
 """Batch scanning state management."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
 import logging
+import time
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.storage import Store
 
-from .const import DEFAULT_QUANTITY, DOMAIN, STORAGE_KEY, STORAGE_VERSION
+from .barcode import canonicalize_barcode
+from .const import (
+    DEFAULT_BATCH_SAVE_DELAY,
+    DEFAULT_QUANTITY,
+    DOMAIN,
+    JOURNAL_COMPACT_THRESHOLD,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from .journal import BatchJournal
+from .metrics import Metrics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,22 +32,28 @@ class BatchItem:
 
     def __init__(self, data: dict[str, Any]) -> None:
         """Initialize batch item from data."""
+        # Canonical key; backends are sent the barcode as it was scanned
         self.barcode = data.get("barcode", "")
+        self.scanned_barcode = data.get("scanned_barcode") or self.barcode
         self.upc_data = data.get("upc_data", {})
         self.backend = data.get("backend", "")
+        # Backend chosen by the user, kept so enrichment resumed after a restart honours it
+        self.manual_backend = data.get("manual_backend")
         self.exists = data.get("exists", False)
         self.quantity = data.get("quantity", DEFAULT_QUANTITY)
         self.pending_confirmation = data.get("pending_confirmation", {})
         self.item_info = data.get("item_info")
-        self.status = data.get("status", "pending")  # pending, confirmed, processed, error
+        self.status = data.get("status", "pending")  # enriching, unresolved, pending, confirmed, queued, processed, error
         self.error_message = data.get("error_message")
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary."""
         return {
             "barcode": self.barcode,
+            "scanned_barcode": self.scanned_barcode,
             "upc_data": self.upc_data,
             "backend": self.backend,
+            "manual_backend": self.manual_backend,
             "exists": self.exists,
             "quantity": self.quantity,
             "pending_confirmation": self.pending_confirmation,
@@ -43,32 +64,205 @@ class BatchItem:
 
 
 class BatchManager:
-    """Manages batch scanning state."""
+    """Manages batch scanning state.
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    Items are kept in an insertion-ordered dict keyed by barcode, so lookups
+    and updates are O(1). They are stored on disk as the version 1 list.
+
+    Every mutation is appended to a journal as it happens, so a scan or a
+    status change costs one small append. The full snapshot is only rewritten
+    when the journal grows past JOURNAL_COMPACT_THRESHOLD records, after the
+    batch has been idle for ``save_delay`` seconds, or on async_flush().
+    load() replays journal records newer than the snapshot, so a crash in the
+    middle of processing keeps every status recorded before it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        save_delay: float = DEFAULT_BATCH_SAVE_DELAY,
+        metrics: Metrics | None = None,
+    ) -> None:
         """Initialize batch manager."""
         self.hass = hass
+        self._metrics = metrics
+        self.save_delay = save_delay
         self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
-        self._batch: dict[str, Any] = {"items": [], "mode": "batch"}
+        self._journal = BatchJournal(hass, STORAGE_KEY)
+        self._items: dict[str, dict[str, Any]] = {}
+        self._mode = "batch"
+        self._seq = 0
+        self._dirty = False
+        self._flush_lock = asyncio.Lock()
+        self._unsub_compact: Callable[[], None] | None = None
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self.saves = 0
+        self.saves_avoided = 0
 
     async def load(self) -> None:
-        """Load batch from storage."""
+        """Load batch from storage and replay the journal on top of it."""
         try:
             data = await self._store.async_load()
             if data:
-                self._batch = data
-                _LOGGER.debug("Loaded batch with %d items", len(self._batch.get("items", [])))
+                self._items = {}
+                for item in data.get("items", []):
+                    if item.get("barcode"):
+                        self._load_item(item)
+                self._mode = data.get("mode", "batch")
+                self._seq = data.get("journal_seq", 0)
+
+            replayed = 0
+            for record in await self._journal.async_read():
+                if record.get("seq", 0) <= self._seq:
+                    continue
+                self._apply(record)
+                self._seq = record["seq"]
+                replayed += 1
+            if replayed:
+                self._dirty = True
+            _LOGGER.debug(
+                "Loaded batch with %d items (%d journal records replayed)",
+                len(self._items),
+                replayed,
+            )
         except Exception as err:
             _LOGGER.error("Error loading batch: %s", err)
-            self._batch = {"items": [], "mode": "batch"}
+            self._items = {}
+            self._mode = "batch"
 
     async def save(self) -> None:
-        """Save batch to storage."""
-        try:
-            await self._store.async_save(self._batch)
-            _LOGGER.debug("Saved batch with %d items", len(self._batch.get("items", [])))
-        except Exception as err:
-            _LOGGER.error("Error saving batch: %s", err)
+        """Persist recent changes.
+
+        Changes are already in the journal, so this only rewrites the snapshot
+        once the journal is large enough, and otherwise schedules it for when
+        the batch goes idle.
+        """
+        if self.save_delay <= 0 or self._journal.size >= JOURNAL_COMPACT_THRESHOLD:
+            await self.async_flush()
+            return
+
+        self.saves_avoided += 1
+        if self._unsub_compact:
+            self._unsub_compact()
+        self._unsub_compact = async_call_later(
+            self.hass, self.save_delay, self._handle_compact_timer
+        )
+
+    @callback
+    def _handle_compact_timer(self, _now: datetime) -> None:
+        """Compact the journal once the batch has been idle."""
+        self._unsub_compact = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_flush(self) -> None:
+        """Write the snapshot now and drop the journal records it contains."""
+        if self._unsub_compact:
+            self._unsub_compact()
+            self._unsub_compact = None
+
+        async with self._flush_lock:
+            seq = self._seq
+            started = time.perf_counter()
+            error = False
+            try:
+                await self._store.async_save({**self.get_batch_data(), "journal_seq": seq})
+                self._dirty = self._seq != seq
+                self.saves += 1
+                await self._journal.async_compact(seq)
+                _LOGGER.debug("Saved batch with %d items", len(self._items))
+            except Exception as err:
+                error = True
+                _LOGGER.error("Error saving batch: %s", err)
+            if self._metrics is not None:
+                self._metrics.record("batch_save", time.perf_counter() - started, error)
+
+    def _record(
+        self, op: str, change: str, barcode: str | None = None, data: Any = None
+    ) -> None:
+        """Append a mutation to the journal and notify listeners of the change."""
+        self._seq += 1
+        self._dirty = True
+        self._journal.append({"seq": self._seq, "op": op, "barcode": barcode, "data": data})
+
+        if not self._listeners:
+            return
+        delta: dict[str, Any] = {"type": "delta", "version": self._seq, "change": change}
+        if barcode is not None:
+            delta["barcode"] = barcode
+            item_data = self._items.get(barcode)
+            if item_data is not None:
+                delta["item"] = dict(item_data)
+        if op == "mode":
+            delta["mode"] = data
+        for listener in list(self._listeners):
+            listener(delta)
+
+    @callback
+    def async_add_listener(
+        self, listener: Callable[[dict[str, Any]], None]
+    ) -> Callable[[], None]:
+        """Listen for item-level changes; returns a function to stop listening.
+
+        Each change is passed as a delta dict with a "version" that increases by
+        one per change and a "change" of added, updated, removed, cleared or mode.
+        """
+        self._listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            # Listeners are already dropped once async_close_listeners ran
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    @callback
+    def async_close_listeners(self) -> None:
+        """Tell listeners that no further changes will be sent."""
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener({"type": "closed", "version": self._seq})
+
+    @property
+    def version(self) -> int:
+        """Return the version of the batch, increased by every change."""
+        return self._seq
+
+    def _load_item(self, item_data: dict[str, Any]) -> None:
+        """Add a stored item under its canonical key.
+
+        Items saved before barcodes were canonicalized are keyed by the scanned
+        barcode. They keep it as scanned_barcode and are merged with an item
+        for the same product, adding up the quantities.
+        """
+        _canonicalize_item(item_data)
+        existing = self._items.get(item_data["barcode"])
+        if existing is None:
+            self._items[item_data["barcode"]] = item_data
+            return
+        existing["quantity"] = existing.get("quantity", DEFAULT_QUANTITY) + item_data.get(
+            "quantity", DEFAULT_QUANTITY
+        )
+        self._dirty = True
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply a journal record to the in-memory batch."""
+        op = record.get("op")
+        barcode = record.get("barcode")
+        if barcode is not None:
+            barcode = canonicalize_barcode(barcode) or barcode
+        data = record.get("data")
+        if op == "set":
+            self._items[barcode] = _canonicalize_item(data)
+        elif op == "update" and barcode in self._items:
+            self._items[barcode].update(data)
+        elif op == "remove":
+            self._items.pop(barcode, None)
+        elif op == "clear":
+            self._items = {}
+            self._mode = "batch"
+        elif op == "mode":
+            self._mode = data
 
     def add_item(
         self,
@@ -77,77 +271,121 @@ class BatchManager:
         backend: str,
         exists: bool,
         item_info: dict[str, Any] | None = None,
+        scanned_barcode: str | None = None,
+        status: str = "pending",
+        error_message: str | None = None,
     ) -> BatchItem:
-        """Add an item to the batch."""
+        """Add an item to the batch.
+
+        Args:
+            barcode: Canonical barcode, the key of the item
+            upc_data: UPC lookup result
+            backend: Backend the item is routed to
+            exists: Whether the item exists in the backend
+            item_info: Item information resolved from the backend
+            scanned_barcode: Barcode as scanned, sent to the backend; the form
+                of the first scan is kept
+            status: "pending", or "unresolved" if the backend could not be
+                asked whether the item exists
+            error_message: Why the item is unresolved
+        """
         # Check if item already exists in batch
-        for item_data in self._batch.get("items", []):
-            if item_data.get("barcode") == barcode:
-                # Update existing item
-                item_data["quantity"] = item_data.get("quantity", DEFAULT_QUANTITY) + 1
-                item_data["upc_data"] = upc_data or item_data.get("upc_data", {})
-                item_data["backend"] = backend
-                item_data["exists"] = exists
-                item_data["item_info"] = item_info
-                item_data["status"] = "pending"
-                _LOGGER.debug("Updated existing item in batch: %s", barcode)
-                return BatchItem(item_data)
+        item_data = self._items.get(barcode)
+        if item_data is not None:
+            # Update existing item
+            item_data.setdefault("scanned_barcode", scanned_barcode or barcode)
+            item_data["quantity"] = item_data.get("quantity", DEFAULT_QUANTITY) + 1
+            item_data["upc_data"] = upc_data or item_data.get("upc_data", {})
+            item_data["backend"] = backend
+            item_data["exists"] = exists
+            item_data["item_info"] = item_info
+            item_data["status"] = status
+            item_data["error_message"] = error_message
+            self._record("set", "updated", barcode, item_data)
+            _LOGGER.debug("Updated existing item in batch: %s", barcode)
+            return BatchItem(item_data)
 
         # Create new item
         item_data = {
             "barcode": barcode,
+            "scanned_barcode": scanned_barcode or barcode,
             "upc_data": upc_data or {},
             "backend": backend,
             "exists": exists,
             "quantity": DEFAULT_QUANTITY,
             "pending_confirmation": {} if not exists else None,
             "item_info": item_info,
-            "status": "pending",
+            "status": status,
+            "error_message": error_message,
         }
-        self._batch.setdefault("items", []).append(item_data)
+        self._items[barcode] = item_data
+        self._record("set", "added", barcode, item_data)
         _LOGGER.debug("Added new item to batch: %s", barcode)
         return BatchItem(item_data)
 
     def get_items(self) -> list[BatchItem]:
         """Get all items in the batch."""
-        return [BatchItem(item) for item in self._batch.get("items", [])]
+        return [BatchItem(item) for item in self._items.values()]
 
     def get_item(self, barcode: str) -> BatchItem | None:
         """Get a specific item from the batch."""
-        for item_data in self._batch.get("items", []):
-            if item_data.get("barcode") == barcode:
-                return BatchItem(item_data)
-        return None
+        item_data = self._items.get(barcode)
+        return BatchItem(item_data) if item_data is not None else None
 
     def update_item(self, barcode: str, updates: dict[str, Any]) -> bool:
         """Update an item in the batch."""
-        for item_data in self._batch.get("items", []):
-            if item_data.get("barcode") == barcode:
-                item_data.update(updates)
-                return True
-        return False
+        item_data = self._items.get(barcode)
+        if item_data is None:
+            return False
+        item_data.update(updates)
+        self._record("update", "updated", barcode, updates)
+        return True
 
     def remove_item(self, barcode: str) -> bool:
         """Remove an item from the batch."""
-        items = self._batch.get("items", [])
-        for i, item_data in enumerate(items):
-            if item_data.get("barcode") == barcode:
-                items.pop(i)
-                return True
-        return False
+        if self._items.pop(barcode, None) is None:
+            return False
+        self._record("remove", "removed", barcode)
+        return True
 
     def clear(self) -> None:
         """Clear the batch."""
-        self._batch = {"items": [], "mode": "batch"}
+        self._items = {}
+        self._mode = "batch"
+        self._record("clear", "cleared")
         _LOGGER.debug("Cleared batch")
 
     def get_batch_data(self) -> dict[str, Any]:
         """Get the raw batch data."""
-        return self._batch.copy()
+        return {"items": list(self._items.values()), "mode": self._mode}
 
     def set_mode(self, mode: str) -> None:
         """Set batch mode (batch or single)."""
-        self._batch["mode"] = mode
+        self._mode = mode
+        self._record("mode", "mode", data=mode)
 
     def get_mode(self) -> str:
         """Get batch mode."""
-        return self._batch.get("mode", "batch")
+        return self._mode
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return persistence counters."""
+        return {
+            "saves": self.saves,
+            "saves_avoided": self.saves_avoided,
+            "dirty": self._dirty,
+            "journal_records": self._journal.size,
+        }
+
+    def __len__(self) -> int:
+        """Return the number of items in the batch."""
+        return len(self._items)
+
+
+def _canonicalize_item(item_data: dict[str, Any]) -> dict[str, Any]:
+    """Key stored item data by its canonical barcode, keeping the scanned form."""
+    scanned = item_data["barcode"]
+    item_data.setdefault("scanned_barcode", scanned)
+    item_data["barcode"] = canonicalize_barcode(scanned) or scanned
+    return item_data
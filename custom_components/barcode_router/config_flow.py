@@ -8,11 +8,40 @@ import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import CONF_GROCY_API_KEY, CONF_GROCY_URL, DOMAIN
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    CONF_BACKGROUND_ENRICHMENT,
+    CONF_BATCH_SAVE_DELAY,
+    CONF_ENRICHMENT_WORKERS,
+    CONF_GROCY_API_KEY,
+    CONF_GROCY_URL,
+    CONF_HTTP_LIMIT_PER_HOST,
+    CONF_LOOKUP_PROVIDERS,
+    CONF_MAX_CONCURRENCY,
+    CONF_PREFIX_ROUTES,
+    CONF_ROUTING_RULES,
+    CONF_UPC_CACHE_MAX_SIZE,
+    CONF_UPC_CACHE_TTL_DAYS,
+    CONF_UPC_NEGATIVE_CACHE_TTL_HOURS,
+    DEFAULT_BACKGROUND_ENRICHMENT,
+    DEFAULT_BATCH_SAVE_DELAY,
+    DEFAULT_ENRICHMENT_WORKERS,
+    DEFAULT_HTTP_LIMIT_PER_HOST,
+    DEFAULT_LOOKUP_PROVIDERS,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PREFIX_ROUTES,
+    DEFAULT_ROUTING_RULES,
+    DEFAULT_UPC_CACHE_MAX_SIZE,
+    DEFAULT_UPC_CACHE_TTL_DAYS,
+    DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS,
+    DOMAIN,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_REQUEST_TIMEOUT,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,16 +55,16 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 
 async def validate_grocy_connection(hass: HomeAssistant, url: str, api_key: str) -> None:
     """Validate Grocy connection."""
+    session = async_get_clientsession(hass)
     try:
-        async with aiohttp.ClientSession() as session:
-            headers = {"GROCY-API-KEY": api_key}
-            async with session.get(
-                f"{url.rstrip('/')}/api/system/info",
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as response:
-                if response.status != 200:
-                    raise CannotConnect
+        headers = {"GROCY-API-KEY": api_key}
+        async with session.get(
+            f"{url.rstrip('/')}/api/system/info",
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+        ) as response:
+            if response.status != 200:
+                raise CannotConnect
     except aiohttp.ClientError as err:
         _LOGGER.exception("Error connecting to Grocy: %s", err)
         raise CannotConnect from err
@@ -46,6 +75,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -77,5 +114,75 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Barcode Router options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_UPC_CACHE_MAX_SIZE,
+                        default=options.get(CONF_UPC_CACHE_MAX_SIZE, DEFAULT_UPC_CACHE_MAX_SIZE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_UPC_CACHE_TTL_DAYS,
+                        default=options.get(CONF_UPC_CACHE_TTL_DAYS, DEFAULT_UPC_CACHE_TTL_DAYS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_UPC_NEGATIVE_CACHE_TTL_HOURS,
+                        default=options.get(
+                            CONF_UPC_NEGATIVE_CACHE_TTL_HOURS, DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_HTTP_LIMIT_PER_HOST,
+                        default=options.get(CONF_HTTP_LIMIT_PER_HOST, DEFAULT_HTTP_LIMIT_PER_HOST),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=HTTP_CONNECTION_LIMIT)),
+                    vol.Optional(
+                        CONF_LOOKUP_PROVIDERS,
+                        default=options.get(CONF_LOOKUP_PROVIDERS, DEFAULT_LOOKUP_PROVIDERS),
+                    ): str,
+                    vol.Optional(
+                        CONF_MAX_CONCURRENCY,
+                        default=options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Optional(
+                        CONF_BATCH_SAVE_DELAY,
+                        default=options.get(CONF_BATCH_SAVE_DELAY, DEFAULT_BATCH_SAVE_DELAY),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+                    vol.Optional(
+                        CONF_BACKGROUND_ENRICHMENT,
+                        default=options.get(CONF_BACKGROUND_ENRICHMENT, DEFAULT_BACKGROUND_ENRICHMENT),
+                    ): bool,
+                    vol.Optional(
+                        CONF_ENRICHMENT_WORKERS,
+                        default=options.get(CONF_ENRICHMENT_WORKERS, DEFAULT_ENRICHMENT_WORKERS),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Optional(
+                        CONF_PREFIX_ROUTES,
+                        default=options.get(CONF_PREFIX_ROUTES, DEFAULT_PREFIX_ROUTES),
+                    ): str,
+                    vol.Optional(
+                        CONF_ROUTING_RULES,
+                        default=options.get(CONF_ROUTING_RULES, DEFAULT_ROUTING_RULES),
+                    ): str,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -7,6 +7,13 @@ DOMAIN = "barcode_router"
 SERVICE_SCAN_BARCODE = "scan_barcode"
 SERVICE_PROCESS_BATCH = "process_batch"
 SERVICE_CLEAR_BATCH = "clear_batch"
+SERVICE_SCAN_BARCODES = "scan_barcodes"
+SERVICE_IMPORT_BATCH = "import_batch"
+SERVICE_EXPORT_BATCH = "export_batch"
+SERVICE_INGEST_PRODUCTS = "ingest_products"
+
+# Websocket commands
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
 
 # Backend types
 BACKEND_GROCY = "grocy"
@@ -17,14 +24,81 @@ BACKEND_LIBRARY = "library"
 CONF_GROCY_URL = "grocy_url"
 CONF_GROCY_API_KEY = "grocy_api_key"
 CONF_BACKENDS = "backends"
+CONF_UPC_CACHE_MAX_SIZE = "upc_cache_max_size"
+CONF_UPC_CACHE_TTL_DAYS = "upc_cache_ttl_days"
+CONF_UPC_NEGATIVE_CACHE_TTL_HOURS = "upc_negative_cache_ttl_hours"
+CONF_HTTP_LIMIT_PER_HOST = "http_limit_per_host"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_BATCH_SAVE_DELAY = "batch_save_delay"
+CONF_BACKGROUND_ENRICHMENT = "background_enrichment"
+CONF_ENRICHMENT_WORKERS = "enrichment_workers"
+CONF_PREFIX_ROUTES = "prefix_routes"
+CONF_ROUTING_RULES = "routing_rules"
+CONF_LOOKUP_PROVIDERS = "lookup_providers"
 
 # State storage keys
 STORAGE_KEY = f"{DOMAIN}_batch"
 STORAGE_VERSION = 1
+JOURNAL_COMPACT_THRESHOLD = 500  # journal records before the snapshot is rewritten
+UPC_CACHE_STORAGE_KEY = f"{DOMAIN}_upc_cache"
+UPC_CACHE_STORAGE_VERSION = 1
+IMPORT_CHECKPOINT_STORAGE_KEY = f"{DOMAIN}_import"
+IMPORT_CHECKPOINT_STORAGE_VERSION = 1
+PRODUCT_DB_FILENAME = f"{DOMAIN}_products.db"
+OUTBOX_STORAGE_KEY = f"{DOMAIN}_outbox"
+OUTBOX_STORAGE_VERSION = 1
+
+# HTTP connection pool
+HTTP_CONNECTION_LIMIT = 50
+HTTP_DNS_CACHE_TTL = 300  # seconds
+HTTP_KEEPALIVE_TIMEOUT = 60  # seconds
+HTTP_REQUEST_TIMEOUT = 10  # seconds
+
+# Grocy product index
+GROCY_INDEX_MAX_AGE = 60  # seconds between change checks for cached hits
+GROCY_INDEX_MISS_MAX_AGE = 5  # seconds between change checks on a miss
+
+# Grocy request resilience
+GROCY_RETRY_ATTEMPTS = 3  # attempts for idempotent requests
+GROCY_RETRY_BASE_DELAY = 0.25  # seconds
+GROCY_RETRY_MAX_DELAY = 2.0  # seconds
+GROCY_CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures before failing fast
+GROCY_CIRCUIT_RESET_TIMEOUT = 30  # seconds before a probe request is let through
 
 # UPC Lookup
 UPC_LOOKUP_API_URL = "https://api.upcitemdb.com/prod/trial/lookup"
+OPEN_FOOD_FACTS_API_URL = "https://world.openfoodfacts.org/api/v2/product/{barcode}.json"
+UPC_CACHE_SAVE_DELAY = 30  # seconds
+LOOKUP_LATENCY_WINDOW = 100  # recent calls kept per provider
+LOOKUP_HEDGE_DELAY_DEFAULT = 1.0  # seconds, until a provider has latency samples
+LOOKUP_HEDGE_DELAY_MIN = 0.1  # seconds
+
+# Local product database
+PRODUCT_DB_INGEST_CHUNK_SIZE = 5000  # rows per insert transaction
+
+# Item type detection
+DETECTOR_CACHE_SIZE = 1024  # memoized routing results
+
+# Outbox of backend writes
+OUTBOX_DRAIN_BATCH_SIZE = 20  # items sent per drain cycle
+OUTBOX_DRAIN_INTERVAL = 1  # seconds between drain cycles
+OUTBOX_RETRY_INTERVAL = 15  # seconds between attempts while a backend is down
+
+# Bulk scanning
+BULK_SCAN_CONCURRENCY = 8
+DEFAULT_TRANSFER_CHUNK_SIZE = 500
 
 # Default values
 DEFAULT_QUANTITY = 1
 DEFAULT_BACKEND = BACKEND_GROCY
+DEFAULT_UPC_CACHE_MAX_SIZE = 5000
+DEFAULT_UPC_CACHE_TTL_DAYS = 30
+DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS = 24
+DEFAULT_HTTP_LIMIT_PER_HOST = 8
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_BATCH_SAVE_DELAY = 5  # seconds
+DEFAULT_BACKGROUND_ENRICHMENT = False
+DEFAULT_ENRICHMENT_WORKERS = 2
+DEFAULT_PREFIX_ROUTES = ""  # Added to the built-in GS1 prefix table
+DEFAULT_ROUTING_RULES = ""
+DEFAULT_LOOKUP_PROVIDERS = "upcitemdb, openfoodfacts"
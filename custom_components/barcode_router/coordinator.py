@@ -1,15 +1,54 @@
 """Data coordinator for Barcode Router."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .backends.base import BackendBase
 from .backends.grocy import GrocyBackend
-from .batch_manager import BatchManager
+from .batch_manager import BatchItem, BatchManager
+from .const import (
+    BULK_SCAN_CONCURRENCY,
+    CONF_BACKGROUND_ENRICHMENT,
+    CONF_BATCH_SAVE_DELAY,
+    CONF_ENRICHMENT_WORKERS,
+    CONF_HTTP_LIMIT_PER_HOST,
+    CONF_LOOKUP_PROVIDERS,
+    CONF_MAX_CONCURRENCY,
+    CONF_PREFIX_ROUTES,
+    CONF_ROUTING_RULES,
+    CONF_UPC_CACHE_MAX_SIZE,
+    CONF_UPC_CACHE_TTL_DAYS,
+    CONF_UPC_NEGATIVE_CACHE_TTL_HOURS,
+    DEFAULT_BACKGROUND_ENRICHMENT,
+    DEFAULT_BACKEND,
+    DEFAULT_BATCH_SAVE_DELAY,
+    DEFAULT_ENRICHMENT_WORKERS,
+    DEFAULT_HTTP_LIMIT_PER_HOST,
+    DEFAULT_LOOKUP_PROVIDERS,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PREFIX_ROUTES,
+    DEFAULT_ROUTING_RULES,
+    DEFAULT_UPC_CACHE_MAX_SIZE,
+    DEFAULT_UPC_CACHE_TTL_DAYS,
+    DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS,
+)
+from .enrichment import EnrichmentQueue
+from .http_session import HttpSessionManager
+from .item_detector import ItemDetector
+from .metrics import Metrics
+from .outbox import Outbox
+from .prefix_router import PrefixRouter
+from .product_db import ProductDatabase
+from .processor import BatchProcessor
+from .singleflight import SingleFlight
+from .upc_cache import UpcCache
+from .upc_lookup import LookupChain, create_providers
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,33 +65,284 @@ class BarcodeRouterCoordinator(DataUpdateCoordinator):
             update_interval=None,  # We don't need periodic updates
         )
         self.entry = entry
-        self.batch_manager = BatchManager(hass)
+        self.metrics = Metrics()
+        self.batch_manager = BatchManager(
+            hass,
+            save_delay=entry.options.get(CONF_BATCH_SAVE_DELAY, DEFAULT_BATCH_SAVE_DELAY),
+            metrics=self.metrics,
+        )
         self.backends: dict[str, Any] = {}
+        self.session_manager = HttpSessionManager(
+            hass,
+            limit_per_host=entry.options.get(CONF_HTTP_LIMIT_PER_HOST, DEFAULT_HTTP_LIMIT_PER_HOST),
+        )
+        self.upc_cache = UpcCache(
+            hass,
+            max_size=entry.options.get(CONF_UPC_CACHE_MAX_SIZE, DEFAULT_UPC_CACHE_MAX_SIZE),
+            ttl=entry.options.get(CONF_UPC_CACHE_TTL_DAYS, DEFAULT_UPC_CACHE_TTL_DAYS) * 86400,
+            negative_ttl=entry.options.get(
+                CONF_UPC_NEGATIVE_CACHE_TTL_HOURS, DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS
+            )
+            * 3600,
+        )
+        self.product_db = ProductDatabase(hass)
+        self.lookup_chain = LookupChain(
+            self.session_manager,
+            create_providers(entry.options.get(CONF_LOOKUP_PROVIDERS, DEFAULT_LOOKUP_PROVIDERS)),
+            cache=self.upc_cache,
+            product_db=self.product_db,
+        )
+        self._lookups = SingleFlight()
+        # Compiled once; changing options reloads the entry and recompiles
+        self.item_detector = ItemDetector(
+            entry.options.get(CONF_ROUTING_RULES, DEFAULT_ROUTING_RULES)
+        )
+        self.last_results: list[dict[str, Any]] = []
 
         # Initialize Grocy backend
         grocy_config = {
             "url": entry.data.get("grocy_url", ""),
             "api_key": entry.data.get("grocy_api_key", ""),
         }
-        self.backends["grocy"] = GrocyBackend(grocy_config)
+        self.backends["grocy"] = GrocyBackend(
+            grocy_config, self.session_manager, self.metrics
+        )
+        # Only routes to a configured backend skip the lookup
+        self.prefix_router = PrefixRouter(
+            entry.options.get(CONF_PREFIX_ROUTES, DEFAULT_PREFIX_ROUTES),
+            self.backends,
+            self.item_detector.prefix_rules,
+        )
+
+        self.processor = BatchProcessor(
+            self.batch_manager,
+            self.backends,
+            max_concurrency=entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            metrics=self.metrics,
+        )
+        self.outbox = Outbox(
+            hass, self.backends, self._async_drain_outbox, self._record_outbox_outcome
+        )
+        self.processor.outbox = self.outbox
+
+        self.background_enrichment = entry.options.get(
+            CONF_BACKGROUND_ENRICHMENT, DEFAULT_BACKGROUND_ENRICHMENT
+        )
+        self.enrichment = EnrichmentQueue(
+            hass,
+            self._async_enrich_item,
+            workers=entry.options.get(CONF_ENRICHMENT_WORKERS, DEFAULT_ENRICHMENT_WORKERS),
+        )
 
     async def async_config_entry_first_refresh(self) -> None:
         """Load batch data on first refresh."""
         await self.batch_manager.load()
+        await self.product_db.async_load()
+        await self.outbox.async_load()
+        self.outbox.async_start()
+        self.enrichment.async_start()
+        # Resume enrichment of scans accepted before a restart
+        for item in self.batch_manager.get_items():
+            if item.status == "enriching":
+                self.enrichment.enqueue(item.barcode, item.manual_backend)
         await super().async_config_entry_first_refresh()
 
+    async def async_lookup_barcode(self, barcode: str) -> dict[str, Any] | None:
+        """Look up a barcode, sharing the request with concurrent scans of it."""
+        with self.metrics.timer("lookup"):
+            return await self._lookups.async_run(
+                barcode,
+                lambda: self.lookup_chain.async_lookup(barcode),
+            )
+
+    async def async_resolve_barcode(
+        self,
+        barcode: str,
+        manual_backend: str | None = None,
+        upc_data: dict[str, Any] | None = None,
+        scanned_barcode: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Look up, route and resolve a barcode against its backend.
+
+        The UPC lookup is skipped when upc_data is already known or when the
+        barcode prefix alone identifies the backend, e.g. ISBNs and in-store
+        labels. Lookups and routing use the canonical barcode; the backend is
+        asked for scanned_barcode, the form the user scanned.
+
+        Returns the batch fields for the item, or None if the detected backend
+        is not available. If the backend could not be asked whether the item
+        exists, its status is "unresolved" and it is checked again when the
+        batch is processed.
+        """
+        route = self.prefix_router.match(barcode) if upc_data is None else None
+        if route is not None:
+            upc_data = {"barcode": barcode, "title": "Unknown Item"}
+            if route.category:
+                upc_data["category"] = route.category
+            backend_type = manual_backend or route.backend
+        else:
+            if upc_data is None:
+                upc_data = await self.async_lookup_barcode(barcode)
+            if not upc_data:
+                _LOGGER.warning("Could not lookup barcode: %s", barcode)
+                # Still add to batch with minimal data
+                upc_data = {"barcode": barcode, "title": "Unknown Item"}
+
+            # Detect item type
+            with self.metrics.timer("detect"):
+                backend_type = self.item_detector.detect(upc_data, manual_backend)
+        _LOGGER.info("Detected backend: %s for barcode: %s", backend_type, barcode)
+
+        backend: BackendBase | None = self.backends.get(backend_type)
+        if not backend:
+            _LOGGER.error("Backend %s not available", backend_type)
+            return None
+
+        # Resolve the item once; the result is carried in the batch item
+        resolved = {
+            "scanned_barcode": scanned_barcode or barcode,
+            "upc_data": upc_data,
+            "backend": backend_type,
+            "exists": False,
+            "item_info": None,
+            "status": "pending",
+            "error_message": None,
+        }
+        try:
+            with self.metrics.timer(f"resolve.{backend_type}"):
+                item_info = await backend.resolve_item(scanned_barcode or barcode)
+        except Exception as err:
+            # Not knowing is not the same as not existing; check again when processing
+            _LOGGER.warning("Could not check %s in %s: %s", barcode, backend_type, err)
+            resolved["status"] = "unresolved"
+            resolved["error_message"] = f"Could not check the backend: {err}"
+            return resolved
+        resolved["exists"] = item_info is not None
+        resolved["item_info"] = item_info
+        return resolved
+
+    async def async_add_scans(
+        self,
+        scans: dict[str, dict[str, Any]],
+        lookup: bool = True,
+    ) -> int:
+        """Add many scanned barcodes to the batch in one pass.
+
+        scans maps each canonical barcode to its "quantity" and optional
+        "scanned_barcode", "backend" and "upc_data". Lookups run concurrently,
+        at most BULK_SCAN_CONCURRENCY at a time, and the batch is saved and
+        refreshed once at the end.
+
+        Args:
+            scans: Barcodes to add
+            lookup: Whether to look up barcodes without upc_data online
+
+        Returns:
+            Number of barcodes added to the batch
+        """
+        if self.background_enrichment and lookup:
+            for barcode, scan in scans.items():
+                self.batch_manager.add_item(
+                    barcode=barcode,
+                    upc_data=None,
+                    backend=scan.get("backend") or DEFAULT_BACKEND,
+                    exists=False,
+                    scanned_barcode=scan.get("scanned_barcode"),
+                )
+                updates = {"quantity": scan["quantity"], "status": "enriching"}
+                if scan.get("backend"):
+                    updates["manual_backend"] = scan["backend"]
+                self.batch_manager.update_item(barcode, updates)
+                self.enrichment.enqueue(barcode, scan.get("backend"))
+            added = len(scans)
+        else:
+            limit = asyncio.Semaphore(BULK_SCAN_CONCURRENCY)
+
+            async def _resolve(barcode: str, scan: dict[str, Any]) -> dict[str, Any] | None:
+                async with limit:
+                    upc_data = scan.get("upc_data")
+                    if upc_data is None and not lookup:
+                        upc_data = {"barcode": barcode, "title": "Unknown Item"}
+                    return await self.async_resolve_barcode(
+                        barcode, scan.get("backend"), upc_data, scan.get("scanned_barcode")
+                    )
+
+            resolved_items = await asyncio.gather(
+                *(_resolve(barcode, scan) for barcode, scan in scans.items())
+            )
+            added = 0
+            for (barcode, scan), resolved in zip(scans.items(), resolved_items):
+                if resolved is None:
+                    continue
+                self.batch_manager.add_item(barcode=barcode, **resolved)
+                self.batch_manager.update_item(barcode, {"quantity": scan["quantity"]})
+                added += 1
+
+        await self.batch_manager.save()
+        await self.async_request_refresh()
+        return added
+
+    async def _async_enrich_item(self, barcode: str, manual_backend: str | None) -> None:
+        """Fill in a batch item that was accepted before being looked up."""
+        item = self.batch_manager.get_item(barcode)
+        resolved = await self.async_resolve_barcode(
+            barcode, manual_backend, scanned_barcode=item.scanned_barcode if item else None
+        )
+        if resolved is None:
+            updates = {"status": "error", "error_message": "Backend not available"}
+        else:
+            updates = resolved
+        # The item may have been removed or cleared while it was queued
+        if self.batch_manager.update_item(barcode, updates):
+            await self.batch_manager.save()
+            await self.async_request_refresh()
+
+    async def _async_drain_outbox(self, items: list[BatchItem]) -> list[dict[str, Any]]:
+        """Send queued writes, recording their outcome in the batch."""
+        results = await self.processor.async_process(items)
+        await self.batch_manager.save()
+        await self.async_request_refresh()
+        return results
+
+    @callback
+    def _record_outbox_outcome(self, item: BatchItem, result: dict[str, Any]) -> None:
+        """Record the outcome of a queued write settled without sending it."""
+        if result["success"]:
+            updates = {"status": "processed", "error_message": None}
+        else:
+            updates = {"status": "error", "error_message": result["error"]}
+        self.batch_manager.update_item(item.barcode, updates)
+
     async def _async_update_data(self) -> dict[str, Any]:
         """Update coordinator data."""
         # Return current batch state
         return {
             "batch": self.batch_manager.get_batch_data(),
             "backends": list(self.backends.keys()),
+            "grocy": self.backends["grocy"].stats,
+            "upc_cache": self.upc_cache.stats,
+            "product_db": self.product_db.stats,
+            "lookup": self.lookup_chain.stats,
+            "prefix_routing": self.prefix_router.stats,
+            "routing_rules": self.item_detector.stats,
+            "persistence": self.batch_manager.stats,
+            "enrichment": self.enrichment.stats,
+            "outbox": self.outbox.stats,
+            "metrics": self.metrics.stats,
         }
 
     async def async_shutdown(self) -> None:
         """Shutdown coordinator and close backends."""
+        await self.enrichment.async_stop()
+        await self.outbox.async_stop()
+        self.batch_manager.async_close_listeners()
+        await self.batch_manager.async_flush()
+        await self.upc_cache.async_flush()
+        await self.product_db.async_close()
+
         # Close backend sessions
         for backend in self.backends.values():
             if hasattr(backend, "close"):
                 await backend.close()
+        await self.session_manager.async_close()
         await super().async_shutdown()
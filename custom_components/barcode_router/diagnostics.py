@@ -0,0 +1,38 @@
+"""Diagnostics support for Barcode Router."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_GROCY_API_KEY, CONF_GROCY_URL, DOMAIN
+from .coordinator import BarcodeRouterCoordinator
+
+TO_REDACT = {CONF_GROCY_API_KEY, CONF_GROCY_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: BarcodeRouterCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = await coordinator._async_update_data()
+
+    # Scanned products are the user's own data, so only the counts are shared
+    items = data.pop("batch")["items"]
+    data["batch"] = {
+        "size": len(items),
+        "status": dict(Counter(item.get("status") for item in items)),
+        "backend": dict(Counter(item.get("backend") for item in items)),
+    }
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        **data,
+    }
@@ -0,0 +1,106 @@
+"""Background enrichment of accepted scans."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_ENRICHMENT_WORKERS
+
+_LOGGER = logging.getLogger(__name__)
+
+EnrichHandler = Callable[[str, str | None], Awaitable[None]]
+
+
+class EnrichmentQueue:
+    """Queue of scanned barcodes waiting for lookup, routing and existence checks.
+
+    A fixed pool of worker tasks runs the handler for each queued barcode. A
+    barcode that is already waiting is not queued a second time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        handler: EnrichHandler,
+        workers: int = DEFAULT_ENRICHMENT_WORKERS,
+    ) -> None:
+        """Initialize the queue."""
+        self.hass = hass
+        self.workers = workers
+        self._handler = handler
+        self._queue: asyncio.Queue[tuple[str, str | None, float]] = asyncio.Queue()
+        self._queued: set[str] = set()
+        self._tasks: list[asyncio.Task[None]] = []
+        self.in_progress = 0
+        self.processed = 0
+        self.failed = 0
+        self._dequeued = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def async_start(self) -> None:
+        """Start the worker pool."""
+        if self._tasks:
+            return
+        for index in range(self.workers):
+            self._tasks.append(
+                self.hass.async_create_background_task(
+                    self._async_worker(), f"barcode_router enrichment worker {index}"
+                )
+            )
+
+    async def async_stop(self) -> None:
+        """Stop the worker pool; queued barcodes stay in the batch as enriching."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, barcode: str, manual_backend: str | None = None) -> None:
+        """Queue a barcode for enrichment."""
+        if barcode in self._queued:
+            return
+        self._queued.add(barcode)
+        self._queue.put_nowait((barcode, manual_backend, time.monotonic()))
+
+    async def async_join(self) -> None:
+        """Wait until every queued barcode has been enriched."""
+        await self._queue.join()
+
+    async def _async_worker(self) -> None:
+        """Enrich queued barcodes until cancelled."""
+        while True:
+            barcode, manual_backend, enqueued = await self._queue.get()
+            self._queued.discard(barcode)
+            waited = time.monotonic() - enqueued
+            self._dequeued += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self.in_progress += 1
+            try:
+                await self._handler(barcode, manual_backend)
+                self.processed += 1
+            except Exception as err:
+                self.failed += 1
+                _LOGGER.exception("Error enriching barcode %s: %s", barcode, err)
+            finally:
+                self.in_progress -= 1
+                self._queue.task_done()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return queue counters."""
+        return {
+            "depth": self._queue.qsize(),
+            "workers": len(self._tasks),
+            "in_progress": self.in_progress,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_wait": round(self._wait_total / self._dequeued, 3) if self._dequeued else None,
+            "max_wait": round(self._wait_max, 3),
+        }
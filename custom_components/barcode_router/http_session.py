@@ -0,0 +1,60 @@
+"""Shared HTTP connection pool for outbound requests."""
+from __future__ import annotations
+
+import logging
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ssl import get_default_context
+
+from .const import (
+    DEFAULT_HTTP_LIMIT_PER_HOST,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_REQUEST_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HttpSessionManager:
+    """Owns the pooled aiohttp session used by the integration.
+
+    Home Assistant's shared session cannot be given its own per-host limit, so
+    the integration keeps a dedicated connector with keep-alive and DNS caching
+    that is reused by the UPC lookup and every backend until shutdown.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, limit_per_host: int = DEFAULT_HTTP_LIMIT_PER_HOST
+    ) -> None:
+        """Initialize the session manager."""
+        self.hass = hass
+        self.limit_per_host = limit_per_host
+        self._session: aiohttp.ClientSession | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ssl=get_default_context(),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+            )
+            _LOGGER.debug("Created pooled HTTP session (%d per host)", self.limit_per_host)
+        return self._session
+
+    async def async_close(self) -> None:
+        """Close the session and its connections."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,10 +1,18 @@
 """Automatic item type detection from UPC data."""
 from __future__ import annotations
 
+from functools import lru_cache
 import logging
+import re
 from typing import Any
 
-from .const import BACKEND_GROCY, BACKEND_HOMEBOX, BACKEND_LIBRARY, DEFAULT_BACKEND
+from .const import (
+    BACKEND_GROCY,
+    BACKEND_HOMEBOX,
+    BACKEND_LIBRARY,
+    DEFAULT_BACKEND,
+    DETECTOR_CACHE_SIZE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -54,8 +62,177 @@ CATEGORY_MAPPINGS: dict[str, str] = {
 }
 
 
+# Title and description keywords, checked in order after categories
+KEYWORD_MAPPINGS: dict[str, str] = {
+    **dict.fromkeys(
+        ["book", "novel", "dvd", "cd", "blu-ray", "game", "software"], BACKEND_LIBRARY
+    ),
+    **dict.fromkeys(
+        ["tool", "screwdriver", "wrench", "hammer", "screw", "bolt", "hardware"],
+        BACKEND_HOMEBOX,
+    ),
+}
+
+RULE_KINDS = ("prefix", "brand", "category", "keyword")
+
+
+def parse_routing_rules(value: str) -> dict[str, dict[str, str]]:
+    """Parse user routing rules.
+
+    Rules are separated by semicolons or new lines and written as
+    kind:value=backend, where kind is prefix, brand, category or keyword,
+    e.g. "brand:DeWalt=homebox; keyword:lego=homebox". Invalid rules are
+    logged and skipped. Prefix rules are applied by the PrefixRouter, before
+    the UPC lookup.
+
+    Returns:
+        Dictionary mapping each rule kind to its {value: backend} rules
+    """
+    rules: dict[str, dict[str, str]] = {kind: {} for kind in RULE_KINDS}
+    for entry in re.split(r"[;\n]", value):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, _, rule = entry.partition(":")
+        match_value, _, backend = rule.rpartition("=")
+        kind, match_value, backend = kind.strip().lower(), match_value.strip(), backend.strip()
+        if kind not in rules or not match_value or not backend:
+            _LOGGER.warning("Ignoring invalid routing rule: %s", entry)
+            continue
+        rules[kind][match_value] = backend.lower()
+    return rules
+
+
+def _compile_alternation(keys: list[str]) -> re.Pattern[str] | None:
+    """Compile keys into one regex that finds any of them in a single pass."""
+    if not keys:
+        return None
+    # Longest first so a longer key wins over a key it contains
+    return re.compile("|".join(re.escape(key) for key in sorted(keys, key=len, reverse=True)))
+
+
+class ItemDetector:
+    """Routing rules compiled once into lookup tables and regexes.
+
+    User rules come first, then the built-in category and keyword mappings.
+    Where several rules of the same kind match, the earliest one wins, as in
+    the order of CATEGORY_MAPPINGS and KEYWORD_MAPPINGS. Results are memoized
+    on the normalized input, so repeated products are routed without matching
+    again.
+    """
+
+    def __init__(self, rules: str = "") -> None:
+        """Compile the built-in mappings and the user rules."""
+        user_rules = parse_routing_rules(rules)
+        # Handed to the PrefixRouter, which routes before the UPC lookup
+        self.prefix_rules = user_rules["prefix"]
+
+        self._brands = {brand.lower(): backend for brand, backend in user_rules["brand"].items()}
+
+        # Lower-cased key -> (priority, backend); a user rule shadows a built-in one
+        self._categories: dict[str, tuple[int, str]] = {}
+        for category, backend in [*user_rules["category"].items(), *CATEGORY_MAPPINGS.items()]:
+            self._categories.setdefault(category.lower(), (len(self._categories), backend))
+        self._category_pattern = _compile_alternation(list(self._categories))
+        # Every part of every known category, so a short category that is part
+        # of a known one is found with one lookup; the earliest category wins
+        self._category_parts: dict[str, tuple[int, str]] = {}
+        for category, value in self._categories.items():
+            for start in range(len(category)):
+                for end in range(start + 1, len(category) + 1):
+                    self._category_parts.setdefault(category[start:end], value)
+
+        self._keywords: dict[str, tuple[int, str]] = {}
+        for keyword, backend in [*user_rules["keyword"].items(), *KEYWORD_MAPPINGS.items()]:
+            self._keywords.setdefault(keyword.lower(), (len(self._keywords), backend))
+        self._keyword_pattern = _compile_alternation(list(self._keywords))
+
+        self._detect = lru_cache(maxsize=DETECTOR_CACHE_SIZE)(self._detect_normalized)
+
+    def detect(self, upc_data: dict[str, Any] | None, manual_override: str | None = None) -> str:
+        """Detect item type from UPC data.
+
+        Args:
+            upc_data: Dictionary with UPC lookup results
+            manual_override: Manual backend selection override
+
+        Returns:
+            Backend type string (grocy, homebox, library)
+        """
+        # Manual override takes precedence
+        if manual_override:
+            _LOGGER.debug("Using manual override: %s", manual_override)
+            return manual_override
+
+        # If no UPC data, default to Grocy
+        if not upc_data:
+            _LOGGER.debug("No UPC data, defaulting to %s", DEFAULT_BACKEND)
+            return DEFAULT_BACKEND
+
+        title = upc_data.get("title") or ""
+        description = upc_data.get("description") or ""
+        return self._detect(
+            str(upc_data.get("brand") or "").strip().lower(),
+            str(upc_data.get("category") or "").strip().lower(),
+            f"{title} {description}".lower(),
+        )
+
+    def _detect_normalized(self, brand: str, category: str, text: str) -> str:
+        """Detect item type from normalized UPC fields."""
+        if brand and brand in self._brands:
+            _LOGGER.debug("Detected backend %s from brand: %s", self._brands[brand], brand)
+            return self._brands[brand]
+
+        if category:
+            # Check exact match, then known categories within the category path
+            match = self._categories.get(category) or self._best_match(
+                self._category_pattern, self._categories, category
+            )
+            if match is None:
+                # A short category may itself be part of a known one
+                match = self._category_parts.get(category)
+            if match is not None:
+                _LOGGER.debug("Detected backend %s from category: %s", match[1], category)
+                return match[1]
+
+        # Try to detect from title/description keywords
+        match = self._best_match(self._keyword_pattern, self._keywords, text)
+        if match is not None:
+            _LOGGER.debug("Detected %s backend from keywords", match[1])
+            return match[1]
+
+        # Default to Grocy for everything else
+        _LOGGER.debug("Defaulting to %s backend", DEFAULT_BACKEND)
+        return DEFAULT_BACKEND
+
+    @staticmethod
+    def _best_match(
+        pattern: re.Pattern[str] | None, table: dict[str, tuple[int, str]], text: str
+    ) -> tuple[int, str] | None:
+        """Return the highest priority entry of table found in text."""
+        if pattern is None:
+            return None
+        return min((table[found] for found in pattern.findall(text)), default=None)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return rule and memo statistics."""
+        info = self._detect.cache_info()
+        return {
+            "categories": len(self._categories),
+            "keywords": len(self._keywords),
+            "brands": len(self._brands),
+            "memo_size": info.currsize,
+            "memo_hits": info.hits,
+            "memo_misses": info.misses,
+        }
+
+
+_DEFAULT_DETECTOR = ItemDetector()
+
+
 def detect_item_type(upc_data: dict[str, Any] | None, manual_override: str | None = None) -> str:
-    """Detect item type from UPC data.
+    """Detect item type from UPC data using only the built-in mappings.
 
     Args:
         upc_data: Dictionary with UPC lookup results
@@ -64,52 +241,7 @@ def detect_item_type(upc_data: dict[str, Any] | None, manual_override: str | Non
     Returns:
         Backend type string (grocy, homebox, library)
     """
-    # Manual override takes precedence
-    if manual_override:
-        _LOGGER.debug("Using manual override: %s", manual_override)
-        return manual_override
-
-    # If no UPC data, default to Grocy
-    if not upc_data:
-        _LOGGER.debug("No UPC data, defaulting to %s", DEFAULT_BACKEND)
-        return DEFAULT_BACKEND
-
-    # Try to detect from category
-    category = upc_data.get("category", "")
-    if category:
-        # Check exact match
-        if category in CATEGORY_MAPPINGS:
-            backend = CATEGORY_MAPPINGS[category]
-            _LOGGER.debug("Detected backend %s from category: %s", backend, category)
-            return backend
-
-        # Check partial match (case-insensitive)
-        category_lower = category.lower()
-        for cat_key, backend in CATEGORY_MAPPINGS.items():
-            if cat_key.lower() in category_lower or category_lower in cat_key.lower():
-                _LOGGER.debug("Detected backend %s from partial category match: %s", backend, category)
-                return backend
-
-    # Try to detect from title/description keywords
-    title = upc_data.get("title", "").lower()
-    description = upc_data.get("description", "").lower()
-    text = f"{title} {description}"
-
-    # Library keywords
-    library_keywords = ["book", "novel", "dvd", "cd", "blu-ray", "game", "software"]
-    if any(keyword in text for keyword in library_keywords):
-        _LOGGER.debug("Detected library backend from keywords")
-        return BACKEND_LIBRARY
-
-    # Homebox keywords
-    homebox_keywords = ["tool", "screwdriver", "wrench", "hammer", "screw", "bolt", "hardware"]
-    if any(keyword in text for keyword in homebox_keywords):
-        _LOGGER.debug("Detected homebox backend from keywords")
-        return BACKEND_HOMEBOX
-
-    # Default to Grocy for everything else
-    _LOGGER.debug("Defaulting to %s backend", DEFAULT_BACKEND)
-    return DEFAULT_BACKEND
+    return _DEFAULT_DETECTOR.detect(upc_data, manual_override)
 
 
 def get_available_backends() -> list[str]:
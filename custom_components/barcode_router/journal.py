@@ -0,0 +1,113 @@
+"""Append-only journal of batch mutations."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BatchJournal:
+    """Newline-delimited JSON journal stored next to the batch snapshot.
+
+    Records are appended from the event loop without blocking: they are
+    buffered and written by a single writer task through the executor, in
+    order. Every record carries a sequence number so records already folded
+    into the snapshot can be skipped on replay and dropped on compaction.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the journal."""
+        self.hass = hass
+        self.path = hass.config.path(".storage", f"{key}.journal")
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+        self._writer: asyncio.Task[None] | None = None
+        self.size = 0
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Queue a record for writing."""
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        self.size += 1
+        if self._writer is None or self._writer.done():
+            self._writer = self.hass.async_create_task(self._async_write())
+
+    async def async_flush(self) -> None:
+        """Wait until all queued records are on disk."""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+        if self._buffer:
+            await self._async_write()
+
+    async def async_read(self) -> list[dict[str, Any]]:
+        """Read all records from disk."""
+        await self.async_flush()
+        async with self._lock:
+            records = await self.hass.async_add_executor_job(self._read)
+        self.size = len(records)
+        return records
+
+    async def async_compact(self, seq: int) -> None:
+        """Drop records up to and including seq, which the snapshot now holds."""
+        await self.async_flush()
+        async with self._lock:
+            self.size = await self.hass.async_add_executor_job(self._compact, seq)
+
+    async def _async_write(self) -> None:
+        """Write buffered records until the buffer is empty."""
+        async with self._lock:
+            while self._buffer:
+                lines, self._buffer = self._buffer, []
+                try:
+                    await self.hass.async_add_executor_job(self._write, lines)
+                except OSError as err:
+                    _LOGGER.error("Error writing batch journal: %s", err)
+
+    def _write(self, lines: list[str]) -> None:
+        """Append lines and sync them to disk."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write("".join(f"{line}\n" for line in lines))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read(self) -> list[dict[str, Any]]:
+        """Read records, ignoring a torn final line from an interrupted write."""
+        records: list[dict[str, Any]] = []
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        _LOGGER.warning("Skipping unreadable batch journal record")
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _compact(self, seq: int) -> int:
+        """Rewrite the journal with only the records newer than seq."""
+        remaining = [
+            json.dumps(record, separators=(",", ":"))
+            for record in self._read()
+            if record.get("seq", 0) > seq
+        ]
+        if not remaining:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return 0
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write("".join(f"{line}\n" for line in remaining))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        return len(remaining)
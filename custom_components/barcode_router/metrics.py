@@ -0,0 +1,98 @@
+"""Latency and error metrics for the scan pipeline."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+import time
+from typing import Any
+
+# Bucket upper bounds in seconds, 25% apart from 0.1 ms to about 50 s, so a
+# percentile read from the buckets is within 25% of the true value
+LATENCY_BUCKETS = tuple(0.0001 * 1.25**index for index in range(60))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram.
+
+    Recording is a binary search over the bucket bounds and two additions, so
+    it can sit on the hot path. Percentiles are read from the buckets.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self._counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        """Record one timed call."""
+        self._counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the upper bound of the bucket holding a percentile, in seconds."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                break
+        return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return counts and latency percentiles in milliseconds."""
+
+        def _ms(seconds: float | None) -> float | None:
+            return round(seconds * 1000, 1) if seconds is not None else None
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+        }
+
+
+class Metrics:
+    """Registry of latency histograms keyed by pipeline stage.
+
+    Stages are named after what they time, with the backend appended where a
+    stage is per backend, e.g. "lookup", "request.grocy" or "batch_save".
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    def record(self, stage: str, seconds: float, error: bool = False) -> None:
+        """Record one timed call of a stage."""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = LatencyHistogram()
+        histogram.record(seconds, error)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block; an exception counts as an error."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(stage, time.perf_counter() - start, error=True)
+            raise
+        self.record(stage, time.perf_counter() - start)
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the statistics of every stage seen so far."""
+        return {stage: histogram.stats for stage, histogram in self._histograms.items()}
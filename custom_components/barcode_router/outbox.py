@@ -0,0 +1,262 @@
+"""Durable queue of backend writes waiting for a backend to come back."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .backends.base import BackendBase
+from .batch_manager import BatchItem
+from .const import (
+    OUTBOX_DRAIN_BATCH_SIZE,
+    OUTBOX_DRAIN_INTERVAL,
+    OUTBOX_RETRY_INTERVAL,
+    OUTBOX_STORAGE_KEY,
+    OUTBOX_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DrainHandler = Callable[[list[BatchItem]], Awaitable[list[dict[str, Any]]]]
+OutcomeCallback = Callable[[BatchItem, dict[str, Any]], None]
+
+STATE_QUEUED = "queued"
+STATE_SENDING = "sending"
+STATE_UNCERTAIN = "uncertain"
+
+
+def idempotency_key(item: BatchItem) -> str:
+    """Return the key that identifies the write for a batch item."""
+    return f"{item.backend}:{item.barcode}"
+
+
+class Outbox:
+    """Persistent queue of batch items to send once their backend is reachable.
+
+    Every entry is keyed by an idempotency key, so an item queued again while
+    its write is still waiting is not queued twice. The key does not make the
+    write itself idempotent, so only writes that provably never reached the
+    backend are queued to be sent again. Creations that may have reached it,
+    e.g. after a timeout, are queued as uncertain.
+
+    Entries are written to disk before anything is sent. An entry is marked
+    as sending, and saved, before its write goes out. If Home Assistant stops
+    mid-send, the entry is found as sending on the next start and becomes
+    uncertain; it is not blindly replayed. An uncertain creation is only sent
+    again once the backend confirms the item does not exist; while the
+    backend cannot be asked, it stays uncertain. An uncertain booking is
+    reported as an error for the user to check, because sending it again
+    could book the stock twice.
+
+    The queue drains in the background, at most OUTBOX_DRAIN_BATCH_SIZE items
+    every OUTBOX_DRAIN_INTERVAL seconds. While the backend is down it retries
+    every OUTBOX_RETRY_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        backends: dict[str, BackendBase],
+        handler: DrainHandler,
+        on_outcome: OutcomeCallback,
+    ) -> None:
+        """Initialize the outbox."""
+        self.hass = hass
+        self._backends = backends
+        self._handler = handler
+        self._on_outcome = on_outcome
+        self._store = Store(hass, OUTBOX_STORAGE_VERSION, OUTBOX_STORAGE_KEY)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.uncertain = 0
+
+    async def async_load(self) -> None:
+        """Load entries saved before a restart."""
+        try:
+            data = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.error("Error loading outbox: %s", err)
+            data = None
+
+        for entry in (data or {}).get("entries", []):
+            if entry.get("state") == STATE_SENDING:
+                entry["state"] = STATE_UNCERTAIN
+            self._entries[entry["key"]] = entry
+        if self._entries:
+            _LOGGER.info("Resuming %d queued backend writes", len(self._entries))
+            self._wakeup.set()
+
+    def async_start(self) -> None:
+        """Start draining in the background."""
+        if self._task is None:
+            self._task = self.hass.async_create_background_task(
+                self._async_run(), "barcode_router outbox"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop draining; entries stay on disk."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._async_save()
+
+    async def async_enqueue(self, items: list[BatchItem], uncertain: bool = False) -> int:
+        """Queue the writes for items, skipping those already queued.
+
+        Args:
+            items: Items whose writes to queue
+            uncertain: Whether the writes may already have reached the backend
+
+        Returns:
+            Number of new entries
+        """
+        added = 0
+        for item in items:
+            key = idempotency_key(item)
+            if key in self._entries:
+                continue
+            self._entries[key] = {
+                "key": key,
+                "item": item.to_dict(),
+                "state": STATE_UNCERTAIN if uncertain else STATE_QUEUED,
+                "enqueued": time.time(),
+                "attempts": 0,
+                "last_error": item.error_message,
+            }
+            added += 1
+        if added:
+            await self._async_save()
+            _LOGGER.info("Queued %d backend writes until the backend is available", added)
+            self._wakeup.set()
+        return added
+
+    def __contains__(self, item: BatchItem) -> bool:
+        """Return whether the write for an item is queued."""
+        return idempotency_key(item) in self._entries
+
+    async def _async_save(self) -> None:
+        """Write the entries to disk."""
+        await self._store.async_save({"entries": list(self._entries.values())})
+
+    async def _async_run(self) -> None:
+        """Drain entries until cancelled."""
+        while True:
+            if not self._entries:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                progressed = await self._async_drain_once()
+            except Exception as err:
+                _LOGGER.exception("Error draining outbox: %s", err)
+                progressed = False
+            await asyncio.sleep(OUTBOX_DRAIN_INTERVAL if progressed else OUTBOX_RETRY_INTERVAL)
+
+    async def _async_drain_once(self) -> bool:
+        """Send one batch of entries.
+
+        Returns:
+            Whether any entry was completed or dropped
+        """
+        entries = list(self._entries.values())[:OUTBOX_DRAIN_BATCH_SIZE]
+        progressed = False
+
+        to_send: list[dict[str, Any]] = []
+        for entry in entries:
+            if entry["state"] == STATE_UNCERTAIN and await self._async_settle_uncertain(entry):
+                progressed = True
+            elif entry["state"] != STATE_UNCERTAIN:
+                # Queued, or an uncertain creation the backend says it does not have
+                to_send.append(entry)
+        if not to_send:
+            return progressed
+
+        for entry in to_send:
+            entry["state"] = STATE_SENDING
+            entry["attempts"] += 1
+        await self._async_save()
+
+        results = await self._handler([BatchItem(entry["item"]) for entry in to_send])
+        # The handler has already recorded each outcome in the batch
+        for entry, result in zip(to_send, results):
+            if result.get("retryable") or result.get("uncertain"):
+                self.retries += 1
+                entry["state"] = STATE_UNCERTAIN if result.get("uncertain") else STATE_QUEUED
+                entry["last_error"] = result.get("error")
+                continue
+            if result["success"]:
+                self.sent += 1
+            else:
+                self.failed += 1
+            del self._entries[entry["key"]]
+            progressed = True
+        await self._async_save()
+        return progressed
+
+    async def _async_settle_uncertain(self, entry: dict[str, Any]) -> bool:
+        """Resolve an entry that may already have reached the backend.
+
+        A creation the backend positively does not have is marked queued, to
+        be sent again; one it has, even partly, is settled by the backend. If
+        the backend cannot be asked, the entry stays uncertain and is checked
+        again on the next drain.
+
+        Returns:
+            Whether the entry was settled
+        """
+        item = BatchItem(entry["item"])
+        backend = self._backends.get(item.backend)
+        if item.exists or backend is None:
+            self.uncertain += 1
+            del self._entries[entry["key"]]
+            self._on_outcome(
+                item,
+                {
+                    "barcode": item.barcode,
+                    "success": False,
+                    "error": "Interrupted while booking; check the stock before processing again",
+                },
+            )
+            return True
+
+        # A creation is only sent again if the backend positively does not
+        # have the item; a partly created item is finished by the backend
+        try:
+            result = await backend.async_recover_creation(item)
+        except Exception as err:
+            _LOGGER.debug("Could not check uncertain creation of %s: %s", item.barcode, err)
+            entry["last_error"] = str(err)
+            return False
+        if result is None:
+            entry["state"] = STATE_QUEUED
+            return False
+        if result["success"]:
+            self.sent += 1
+        else:
+            self.failed += 1
+        del self._entries[entry["key"]]
+        self._on_outcome(item, result)
+        return True
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return queue statistics."""
+        oldest = min((entry["enqueued"] for entry in self._entries.values()), default=None)
+        return {
+            "depth": len(self._entries),
+            "oldest_age": round(time.time() - oldest, 1) if oldest is not None else None,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "uncertain": self.uncertain,
+        }
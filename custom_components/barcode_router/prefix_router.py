@@ -0,0 +1,142 @@
+"""Offline routing of barcodes by their GS1 prefix."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import logging
+
+from .const import BACKEND_GROCY, BACKEND_LIBRARY
+
+_LOGGER = logging.getLogger(__name__)
+
+# GS1 prefixes that identify an item without a UPC lookup, matched against the
+# EAN-13 form of the barcode. A longer prefix wins over a shorter one.
+GS1_PREFIX_ROUTES: dict[str, tuple[str, str]] = {
+    # ISBN (Bookland)
+    "978": (BACKEND_LIBRARY, "Books"),
+    "979": (BACKEND_LIBRARY, "Books"),
+    # ISMN (printed music)
+    "9790": (BACKEND_LIBRARY, "Music"),
+    # In-store and variable-weight labels, UPC-A number system 2
+    "02": (BACKEND_GROCY, "Food"),
+    **{str(prefix): (BACKEND_GROCY, "Food") for prefix in range(20, 30)},
+}
+
+
+@dataclass(frozen=True)
+class PrefixRoute:
+    """Backend and category assigned to a barcode prefix."""
+
+    prefix: str
+    backend: str
+    category: str
+
+
+def parse_prefix_routes(value: str) -> dict[str, tuple[str, str]]:
+    """Parse user prefix routes.
+
+    The value is a comma separated list of prefix=backend entries, where the
+    prefix may be a range such as 20-29, e.g. "978=library, 20-29=grocy".
+    Invalid entries are logged and skipped.
+
+    Returns:
+        Dictionary mapping each prefix to its (backend, category)
+    """
+    routes: dict[str, tuple[str, str]] = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        prefixes, _, backend = entry.partition("=")
+        prefixes, backend = prefixes.strip(), backend.strip().lower()
+        start, _, end = prefixes.partition("-")
+        end = end or start
+        if (
+            not backend
+            or not start.isdigit()
+            or not end.isdigit()
+            or len(start) != len(end)
+            or start > end
+        ):
+            _LOGGER.warning("Ignoring invalid prefix route: %s", entry)
+            continue
+        for prefix in range(int(start), int(end) + 1):
+            routes[str(prefix).zfill(len(start))] = (backend, "")
+    return routes
+
+
+class PrefixRouter:
+    """Route barcodes to a backend from their digits alone.
+
+    The prefix table is split by prefix length when built, so matching a
+    barcode costs one dictionary lookup per distinct prefix length. Routes to
+    a backend that is not set up are dropped, so those barcodes fall through
+    to the UPC lookup and detection.
+    """
+
+    def __init__(
+        self,
+        extra_routes: str = "",
+        backends: Iterable[str] | None = None,
+        rule_routes: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the router with the default table and user routes.
+
+        Args:
+            extra_routes: User prefix routes, see parse_prefix_routes
+            backends: Backends that are set up; None keeps every route
+            rule_routes: Prefix rules from the routing rules option, mapping
+                each prefix to its backend; they win over extra_routes
+        """
+        routes = dict(GS1_PREFIX_ROUTES)
+        routes.update(parse_prefix_routes(extra_routes))
+        for prefix, backend in (rule_routes or {}).items():
+            if prefix.isdigit():
+                routes[prefix] = (backend, "")
+            else:
+                _LOGGER.warning("Ignoring invalid prefix rule: %s", prefix)
+        if backends is not None:
+            available = set(backends)
+            routes = {
+                prefix: route for prefix, route in routes.items() if route[0] in available
+            }
+
+        self._tables: dict[int, dict[str, PrefixRoute]] = {}
+        for prefix, (backend, category) in routes.items():
+            self._tables.setdefault(len(prefix), {})[prefix] = PrefixRoute(
+                prefix, backend, category
+            )
+        self._lengths = sorted(self._tables, reverse=True)
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, barcode: str) -> PrefixRoute | None:
+        """Return the route for a barcode, or None if no prefix applies.
+
+        Only UPC-A and EAN-13 barcodes are matched; a UPC-A code is read as
+        its EAN-13 form with a leading zero.
+        """
+        if len(barcode) == 12:
+            barcode = f"0{barcode}"
+        if len(barcode) != 13 or not barcode.isdigit():
+            self.misses += 1
+            return None
+
+        for length in self._lengths:
+            route = self._tables[length].get(barcode[:length])
+            if route is not None:
+                self.hits += 1
+                return route
+        self.misses += 1
+        return None
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """Return routing statistics."""
+        total = self.hits + self.misses
+        return {
+            "prefixes": sum(len(table) for table in self._tables.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
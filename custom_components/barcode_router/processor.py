@@ -0,0 +1,178 @@
+"""Concurrent batch processing against backends."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .backends.base import BackendBase
+from .batch_manager import BatchItem, BatchManager
+from .const import DEFAULT_MAX_CONCURRENCY
+from .metrics import Metrics
+
+if TYPE_CHECKING:
+    from .outbox import Outbox
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BatchProcessor:
+    """Processes batch items with bounded parallelism per backend.
+
+    Each backend gets its own semaphore so a slow backend cannot be flooded.
+    Items the backend could not be asked about when scanned are checked first,
+    so they are never created only because the backend was unreachable.
+    Items whose write provably never reached the backend are marked queued
+    and handed to the outbox, if one is set, instead of being reported as
+    errors. Creations that may have reached it are handed over as uncertain,
+    so the outbox checks the backend before sending them again.
+    """
+
+    def __init__(
+        self,
+        batch_manager: BatchManager,
+        backends: dict[str, BackendBase],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        metrics: Metrics | None = None,
+    ) -> None:
+        """Initialize the processor."""
+        self.batch_manager = batch_manager
+        self.metrics = metrics
+        self.backends = backends
+        self.max_concurrency = max_concurrency
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self.outbox: Outbox | None = None
+
+    def _get_semaphore(self, backend_type: str) -> asyncio.Semaphore:
+        """Get the concurrency limit for a backend."""
+        if backend_type not in self._semaphores:
+            self._semaphores[backend_type] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[backend_type]
+
+    async def async_process(self, items: list[BatchItem]) -> list[dict[str, Any]]:
+        """Process items and return one result per item, in the given order.
+
+        Items are grouped by backend and each group is handed to the backend's
+        process_items, so backends can combine work across items.
+        """
+        results: list[dict[str, Any] | None] = [None] * len(items)
+        groups: dict[str, list[int]] = {}
+        for index, item in enumerate(items):
+            groups.setdefault(item.backend, []).append(index)
+
+        async def _process_group(backend_type: str, indexes: list[int]) -> None:
+            backend = self.backends.get(backend_type)
+            group = [items[index] for index in indexes]
+            if not backend:
+                _LOGGER.error("Backend %s not available for %d items", backend_type, len(group))
+                group_results = []
+                for item in group:
+                    result = {"barcode": item.barcode, "success": False, "error": "Backend not available"}
+                    self._record_result(item, result, f"Backend {backend_type} not available")
+                    group_results.append(result)
+            else:
+                limit = self._get_semaphore(backend_type)
+                # Items the backend could not be asked about when scanned
+                unresolved = [index for index in indexes if items[index].status == "unresolved"]
+                checked = await asyncio.gather(
+                    *(self._async_check_unresolved(backend, items[index], limit) for index in unresolved)
+                )
+                for index, result in zip(unresolved, checked):
+                    results[index] = result
+                indexes = [index for index in indexes if results[index] is None]
+                group = [items[index] for index in indexes]
+
+                def _on_result(
+                    item: BatchItem, result: dict[str, Any], elapsed: float | None
+                ) -> None:
+                    # Duration of the item's own backend call, not its wait for a slot
+                    if self.metrics is not None and elapsed is not None:
+                        self.metrics.record(
+                            f"process.{backend_type}", elapsed, error=not result["success"]
+                        )
+                    self._record_result(item, result)
+
+                group_results = await backend.process_items(group, limit, on_result=_on_result)
+            for index, result in zip(indexes, group_results):
+                results[index] = result
+
+        await asyncio.gather(
+            *(_process_group(backend_type, indexes) for backend_type, indexes in groups.items())
+        )
+
+        retry: list[BatchItem] = []
+        if self.outbox is not None:
+            retry = [item for item, result in zip(items, results) if result and result.get("retryable")]
+            uncertain = [
+                item for item, result in zip(items, results) if result and result.get("uncertain")
+            ]
+            if retry:
+                await self.outbox.async_enqueue(retry)
+            if uncertain:
+                await self.outbox.async_enqueue(uncertain, uncertain=True)
+            retry.extend(uncertain)
+
+        succeeded = sum(1 for result in results if result and result["success"])
+        _LOGGER.info(
+            "Processed %d items: %d succeeded, %d queued for retry, %d failed",
+            len(results),
+            succeeded,
+            len(retry),
+            len(results) - succeeded - len(retry),
+        )
+        return [result for result in results if result is not None]
+
+    async def _async_check_unresolved(
+        self, backend: BackendBase, item: BatchItem, limit: asyncio.Semaphore
+    ) -> dict[str, Any] | None:
+        """Ask the backend whether an unresolved item exists.
+
+        The item is updated in place and in the batch.
+
+        Returns:
+            A failed result if the backend still cannot be asked, since
+            processing the item would have to guess whether to book or create;
+            None if the item can be processed
+        """
+        try:
+            async with limit:
+                item_info = await backend.resolve_item(item.scanned_barcode)
+        except Exception as err:
+            result = {
+                "barcode": item.barcode,
+                "success": False,
+                "error": f"Could not check the backend: {err}",
+            }
+            # Nothing was written, so the item can wait for the backend
+            if not backend.available:
+                result["retryable"] = True
+            self._record_result(item, result)
+            return result
+
+        item.exists = item_info is not None
+        item.item_info = item_info
+        item.status = "pending"
+        item.error_message = None
+        self.batch_manager.update_item(
+            item.barcode,
+            {"exists": item.exists, "item_info": item_info, "status": "pending", "error_message": None},
+        )
+        return None
+
+    def _record_result(
+        self, item: BatchItem, result: dict[str, Any], error_message: str | None = None
+    ) -> None:
+        """Record the outcome of an item in the batch as soon as it finishes."""
+        if result["success"]:
+            self.batch_manager.update_item(item.barcode, {"status": "processed"})
+        elif self.outbox is not None and (result.get("retryable") or result.get("uncertain")):
+            self.batch_manager.update_item(
+                item.barcode, {"status": "queued", "error_message": result["error"]}
+            )
+        else:
+            # An item that still could not be checked is checked again next time
+            status = "unresolved" if item.status == "unresolved" else "error"
+            self.batch_manager.update_item(
+                item.barcode,
+                {"status": status, "error_message": error_message or result["error"]},
+            )
@@ -0,0 +1,237 @@
+"""Local product database for offline UPC lookups."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import csv
+import gzip
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant
+
+from .barcode import canonicalize_barcode
+from .batch_io import TransferError, resolve_config_path
+from .const import PRODUCT_DB_FILENAME, PRODUCT_DB_INGEST_CHUNK_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Product dumps such as the Open Food Facts exports, optionally gzipped
+PRODUCT_DUMP_FORMATS = {
+    ".csv": "csv",
+    ".csv.gz": "csv",
+    ".tsv": "csv",
+    ".tsv.gz": "csv",
+    ".jsonl": "ndjson",
+    ".jsonl.gz": "ndjson",
+    ".ndjson": "ndjson",
+    ".ndjson.gz": "ndjson",
+}
+
+
+def _first(value: Any) -> str:
+    """Return the first entry of a comma separated field or list."""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    return str(value or "").split(",")[0].strip()
+
+
+def _product_row(record: dict[str, Any]) -> tuple[str, str, str, str, str] | None:
+    """Map an Open Food Facts style record to a database row."""
+    barcode = canonicalize_barcode(str(record.get("code") or record.get("barcode") or ""))
+    title = str(record.get("product_name") or record.get("title") or "").strip()
+    if barcode is None or not title:
+        return None
+    category = record.get("categories_en") or record.get("categories") or record.get("category")
+    if isinstance(category, list):
+        category = ", ".join(category)
+    return (
+        barcode,
+        title,
+        _first(record.get("brands") or record.get("brand")),
+        str(category or ""),
+        str(record.get("generic_name") or record.get("description") or ""),
+    )
+
+
+class ProductDatabase:
+    """SQLite product table keyed by canonical barcode.
+
+    Lookups use their own connection, and ingestion opens a separate one. In
+    WAL mode, scans can keep reading while a dump is being loaded. All SQLite
+    calls block, so they run in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the database."""
+        self.hass = hass
+        self.path = hass.config.path(".storage", PRODUCT_DB_FILENAME)
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating the table if needed."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "barcode TEXT PRIMARY KEY, title TEXT, brand TEXT, category TEXT, description TEXT"
+            ") WITHOUT ROWID"
+        )
+        return connection
+
+    async def async_load(self) -> None:
+        """Open an existing database; none is created until a dump is ingested."""
+        if not await self.hass.async_add_executor_job(os.path.exists, self.path):
+            return
+        try:
+            await self.hass.async_add_executor_job(self._open)
+        except sqlite3.Error as err:
+            _LOGGER.error("Error opening product database: %s", err)
+
+    def _open(self) -> None:
+        """Open the lookup connection and count the products."""
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            self.size = self._connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    async def async_get(self, barcode: str) -> dict[str, Any] | None:
+        """Look up a barcode.
+
+        Returns:
+            Product information in the same shape as a UPC lookup, or None if
+            the barcode is not in the database
+        """
+        if not self.size:
+            return None
+        try:
+            row = await self.hass.async_add_executor_job(self._get, barcode)
+        except sqlite3.Error as err:
+            _LOGGER.error("Error reading product database: %s", err)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {
+            "barcode": barcode,
+            "title": row[0],
+            "brand": row[1],
+            "model": "",
+            "category": row[2],
+            "description": row[3],
+            "images": [],
+            "offers": [],
+        }
+
+    def _get(self, barcode: str) -> tuple[str, str, str, str] | None:
+        """Read one product by primary key."""
+        with self._lock:
+            if self._connection is None:
+                return None
+            return self._connection.execute(
+                "SELECT title, brand, category, description FROM products WHERE barcode = ?",
+                (barcode,),
+            ).fetchone()
+
+    async def async_ingest(self, filename: str, replace: bool = False) -> int:
+        """Stream a product dump into the database.
+
+        The file is read and inserted PRODUCT_DB_INGEST_CHUNK_SIZE rows at a
+        time, so memory use does not grow with the size of the dump. Records
+        without a valid barcode or a product name are skipped.
+
+        Args:
+            filename: CSV/TSV or NDJSON file in the config directory, optionally gzipped
+            replace: Remove all existing products first
+
+        Returns:
+            Number of products written
+        """
+        path, file_format = resolve_config_path(self.hass, filename, PRODUCT_DUMP_FORMATS)
+        try:
+            count = await self.hass.async_add_executor_job(
+                self._ingest, path, file_format, replace
+            )
+        except (OSError, UnicodeError, csv.Error, sqlite3.Error) as err:
+            raise TransferError(f"Cannot ingest {filename}: {err}") from err
+        await self.hass.async_add_executor_job(self._open)
+        _LOGGER.info("Ingested %d products from %s, %d in database", count, filename, self.size)
+        return count
+
+    def _ingest(self, path: str, file_format: str, replace: bool) -> int:
+        """Insert the products of a dump file."""
+        opener = gzip.open if path.lower().endswith(".gz") else open
+        connection = self._connect()
+        # Open Food Facts rows carry very long ingredient and nutrient fields.
+        # The limit is process wide, so the previous one is restored afterwards.
+        previous_limit = csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+        try:
+            with opener(path, "rt", encoding="utf-8", errors="replace", newline="") as file:
+                records = _iter_csv(file) if file_format == "csv" else _iter_ndjson(file)
+                rows = filter(None, map(_product_row, records))
+                if replace:
+                    connection.execute("DELETE FROM products")
+                count = 0
+                while chunk := list(itertools.islice(rows, PRODUCT_DB_INGEST_CHUNK_SIZE)):
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)", chunk
+                    )
+                    connection.commit()
+                    count += len(chunk)
+            return count
+        finally:
+            csv.field_size_limit(previous_limit)
+            connection.commit()
+            connection.close()
+
+    async def async_close(self) -> None:
+        """Close the lookup connection."""
+        await self.hass.async_add_executor_job(self._close)
+
+    def _close(self) -> None:
+        """Close the lookup connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return database statistics."""
+        return {"size": self.size, "hits": self.hits, "misses": self.misses}
+
+
+def _iter_csv(file: IO[str]) -> Iterator[dict[str, Any]]:
+    """Yield CSV records, detecting the tab separated Open Food Facts export."""
+    header = file.readline()
+    delimiter = "\t" if "\t" in header else ","
+    # The tab separated export does not quote fields
+    quoting = csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL
+    fields = next(csv.reader([header], delimiter=delimiter, quoting=quoting), [])
+    yield from csv.DictReader(file, fieldnames=fields, delimiter=delimiter, quoting=quoting)
+
+
+def _iter_ndjson(file: IO[str]) -> Iterator[dict[str, Any]]:
+    """Yield one record per readable line."""
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            _LOGGER.warning("Skipping unreadable line %d", line_number)
+            continue
+        if isinstance(record, dict):
+            yield record
@@ -0,0 +1,110 @@
+"""Retry backoff and circuit breaking for calls to external services."""
+from __future__ import annotations
+
+import logging
+import random
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Error to indicate a call was refused because the service is down."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Return a jittered exponential delay before retry number attempt.
+
+    Uses full jitter, a uniform delay up to base * 2**attempt, so clients that
+    failed together do not retry together.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Circuit breaker for one external service.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail at once instead of waiting for a timeout. Once reset_timeout seconds
+    have passed, a single probe call is let through. If it succeeds the circuit
+    closes, otherwise it opens again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        """Initialize the breaker."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.rejected = 0
+        self.trips = 0
+
+    def before_call(self) -> None:
+        """Check that a call may be made.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                probe already in flight
+        """
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} is unavailable")
+            self.state = STATE_HALF_OPEN
+            self._probing = False
+
+        if self.state == STATE_HALF_OPEN:
+            # A probe that never reported back, e.g. cancelled, is replaced
+            if self._probing and time.monotonic() - self._probe_started < self.reset_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} is unavailable")
+            self._probing = True
+            self._probe_started = time.monotonic()
+            _LOGGER.debug("Probing %s", self.name)
+
+    def record_success(self) -> None:
+        """Record a call that reached the service."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("%s is available again", self.name)
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a call that failed because of the service."""
+        self._failures += 1
+        if self.state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state == STATE_CLOSED:
+                self.trips += 1
+                _LOGGER.warning(
+                    "%s failed %d times in a row, pausing calls for %ds",
+                    self.name,
+                    self._failures,
+                    self.reset_timeout,
+                )
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    @property
+    def healthy(self) -> bool:
+        """Return whether the circuit is closed and the last call succeeded."""
+        return self.state == STATE_CLOSED and self._failures == 0
+
+    @property
+    def stats(self) -> dict[str, str | int]:
+        """Return breaker statistics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,150 @@
+"""Sensors exposing Barcode Router pipeline metrics."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import BarcodeRouterCoordinator
+
+# Stages timed for every pipeline; "{backend}" is filled in per backend
+LATENCY_STAGES = ("lookup", "detect", "batch_save")
+BACKEND_LATENCY_STAGES = ("resolve.{backend}", "request.{backend}", "process.{backend}")
+
+
+@dataclass(frozen=True, kw_only=True)
+class BarcodeRouterSensorEntityDescription(SensorEntityDescription):
+    """Describes a Barcode Router sensor."""
+
+    value_fn: Callable[[dict[str, Any]], Any]
+    attributes_fn: Callable[[dict[str, Any]], dict[str, Any]] | None = None
+
+
+def _rate(value: float | None) -> float | None:
+    """Return a 0-1 rate as a percentage."""
+    return round(value * 100, 1) if value is not None else None
+
+
+def _latency_description(stage: str) -> BarcodeRouterSensorEntityDescription:
+    """Describe the p95 latency sensor of a stage, with the rest as attributes."""
+
+    def _stats(data: dict[str, Any]) -> dict[str, Any]:
+        return data["metrics"].get(stage, {})
+
+    return BarcodeRouterSensorEntityDescription(
+        key=f"latency_{stage.replace('.', '_')}",
+        name=f"{stage.replace('.', ' ').replace('_', ' ').capitalize()} latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=1,
+        value_fn=lambda data: _stats(data).get("p95_ms"),
+        attributes_fn=lambda data: {
+            key: value for key, value in _stats(data).items() if key != "p95_ms"
+        },
+    )
+
+
+SENSOR_DESCRIPTIONS: tuple[BarcodeRouterSensorEntityDescription, ...] = (
+    BarcodeRouterSensorEntityDescription(
+        key="batch_size",
+        name="Batch size",
+        icon="mdi:barcode-scan",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: len(data["batch"]["items"]),
+    ),
+    BarcodeRouterSensorEntityDescription(
+        key="upc_cache_hit_rate",
+        name="UPC cache hit rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: _rate(data["upc_cache"]["hit_rate"]),
+        attributes_fn=lambda data: data["upc_cache"],
+    ),
+    BarcodeRouterSensorEntityDescription(
+        key="prefix_routing_hit_rate",
+        name="Prefix routing hit rate",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: _rate(data["prefix_routing"]["hit_rate"]),
+        attributes_fn=lambda data: data["prefix_routing"],
+    ),
+    BarcodeRouterSensorEntityDescription(
+        key="outbox_depth",
+        name="Outbox depth",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data["outbox"]["depth"],
+        attributes_fn=lambda data: data["outbox"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Barcode Router sensors from a config entry."""
+    coordinator: BarcodeRouterCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    stages = list(LATENCY_STAGES)
+    for backend in coordinator.backends:
+        stages.extend(stage.format(backend=backend) for stage in BACKEND_LATENCY_STAGES)
+
+    descriptions = [*SENSOR_DESCRIPTIONS, *(_latency_description(stage) for stage in stages)]
+    async_add_entities(
+        BarcodeRouterSensor(coordinator, entry, description) for description in descriptions
+    )
+
+
+class BarcodeRouterSensor(CoordinatorEntity[BarcodeRouterCoordinator], SensorEntity):
+    """Sensor reading one figure from the coordinator data."""
+
+    _attr_has_entity_name = True
+    entity_description: BarcodeRouterSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: BarcodeRouterCoordinator,
+        entry: ConfigEntry,
+        description: BarcodeRouterSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="Barcode Router",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the sensor value."""
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the sensor attributes."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator.data)
@@ -10,17 +10,21 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import config_validation as cv
 
-from .backends.base import BackendBase
-from .batch_manager import BatchItem
+from .barcode import canonicalize_barcode
+from .batch_io import TransferError, async_export_batch, async_import_batch
 from .const import (
+    DEFAULT_BACKEND,
     DEFAULT_QUANTITY,
+    DEFAULT_TRANSFER_CHUNK_SIZE,
     DOMAIN,
     SERVICE_CLEAR_BATCH,
+    SERVICE_EXPORT_BATCH,
+    SERVICE_IMPORT_BATCH,
+    SERVICE_INGEST_PRODUCTS,
     SERVICE_PROCESS_BATCH,
     SERVICE_SCAN_BARCODE,
+    SERVICE_SCAN_BARCODES,
 )
-from .item_detector import detect_item_type
-from .upc_lookup import lookup_barcode
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +36,52 @@ SCAN_BARCODE_SCHEMA = vol.Schema(
     }
 )
 
+SCAN_BARCODES_SCHEMA = vol.Schema(
+    {
+        vol.Required("barcodes"): vol.All(
+            cv.ensure_list,
+            [
+                vol.Any(
+                    vol.Schema(
+                        {
+                            vol.Required("barcode"): cv.string,
+                            vol.Optional("backend"): cv.string,
+                            vol.Optional("quantity", default=DEFAULT_QUANTITY): vol.Coerce(int),
+                        }
+                    ),
+                    cv.string,
+                )
+            ],
+        ),
+        vol.Optional("backend"): cv.string,  # Manual override for every barcode
+    }
+)
+
+IMPORT_BATCH_SCHEMA = vol.Schema(
+    {
+        vol.Required("filename"): cv.string,
+        vol.Optional("lookup", default=False): cv.boolean,
+        vol.Optional("chunk_size", default=DEFAULT_TRANSFER_CHUNK_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=10000)
+        ),
+        vol.Optional("restart", default=False): cv.boolean,
+    }
+)
+
+EXPORT_BATCH_SCHEMA = vol.Schema(
+    {
+        vol.Required("filename"): cv.string,
+        vol.Optional("source", default="batch"): vol.In(["batch", "results"]),
+    }
+)
+
+INGEST_PRODUCTS_SCHEMA = vol.Schema(
+    {
+        vol.Required("filename"): cv.string,
+        vol.Optional("replace", default=False): cv.boolean,
+    }
+)
+
 PROCESS_BATCH_SCHEMA = vol.Schema(
     {
         vol.Optional("item_overrides"): vol.Schema(
@@ -59,47 +109,49 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     async def handle_scan_barcode(call: ServiceCall) -> None:
         """Handle scan_barcode service call."""
         coordinator = get_coordinator()
-        barcode = call.data.get("barcode", "").strip()
+        raw_barcode = call.data.get("barcode", "").strip()
         manual_backend = call.data.get("backend")
         quantity = call.data.get("quantity", DEFAULT_QUANTITY)
 
-        if not barcode:
+        if not raw_barcode:
             _LOGGER.error("No barcode provided")
             return
 
+        # Reject misreads before any lookup and key everything by one form
+        barcode = canonicalize_barcode(raw_barcode)
+        if barcode is None:
+            _LOGGER.error("Invalid barcode %s: check digit does not match", raw_barcode)
+            return
+
         _LOGGER.info("Scanning barcode: %s", barcode)
 
-        # Lookup UPC
-        upc_data = await lookup_barcode(barcode)
-        if not upc_data:
-            _LOGGER.warning("Could not lookup barcode: %s", barcode)
-            # Still add to batch with minimal data
-            upc_data = {"barcode": barcode, "title": "Unknown Item"}
-
-        # Detect item type
-        backend_type = detect_item_type(upc_data, manual_backend)
-        _LOGGER.info("Detected backend: %s for barcode: %s", backend_type, barcode)
-
-        # Get backend
-        backend: BackendBase | None = coordinator.backends.get(backend_type)
-        if not backend:
-            _LOGGER.error("Backend %s not available", backend_type)
+        if coordinator.background_enrichment:
+            # Accept the scan now; lookup and routing happen in the background
+            coordinator.batch_manager.add_item(
+                barcode=barcode,
+                upc_data=None,
+                backend=manual_backend or DEFAULT_BACKEND,
+                exists=False,
+                scanned_barcode=raw_barcode,
+            )
+            updates = {"quantity": quantity, "status": "enriching"}
+            if manual_backend:
+                updates["manual_backend"] = manual_backend
+            coordinator.batch_manager.update_item(barcode, updates)
+            coordinator.enrichment.enqueue(barcode, manual_backend)
+            await coordinator.batch_manager.save()
+            await coordinator.async_request_refresh()
+            _LOGGER.info("Accepted barcode %s for background enrichment", barcode)
             return
 
-        # Check if item exists
-        exists = await backend.check_item_exists(barcode)
-        item_info = None
-        if exists:
-            item_info = await backend.get_item_info(barcode)
+        resolved = await coordinator.async_resolve_barcode(
+            barcode, manual_backend, scanned_barcode=raw_barcode
+        )
+        if resolved is None:
+            return
 
         # Add to batch
-        batch_item = coordinator.batch_manager.add_item(
-            barcode=barcode,
-            upc_data=upc_data,
-            backend=backend_type,
-            exists=exists,
-            item_info=item_info,
-        )
+        batch_item = coordinator.batch_manager.add_item(barcode=barcode, **resolved)
         batch_item.quantity = quantity
         coordinator.batch_manager.update_item(barcode, batch_item.to_dict())
 
@@ -110,98 +162,123 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         _LOGGER.info(
             "Added barcode %s to batch (exists: %s, backend: %s)",
             barcode,
-            exists,
-            backend_type,
+            resolved["exists"],
+            resolved["backend"],
         )
 
+    async def handle_scan_barcodes(call: ServiceCall) -> None:
+        """Handle scan_barcodes service call."""
+        coordinator = get_coordinator()
+        default_backend = call.data.get("backend")
+
+        # Merge repeated barcodes, summing their quantities
+        scans: dict[str, dict[str, Any]] = {}
+        for entry_data in call.data["barcodes"]:
+            if isinstance(entry_data, str):
+                entry_data = {"barcode": entry_data, "quantity": DEFAULT_QUANTITY}
+            barcode = canonicalize_barcode(entry_data["barcode"])
+            if barcode is None:
+                if entry_data["barcode"].strip():
+                    _LOGGER.warning("Skipping invalid barcode %s", entry_data["barcode"])
+                continue
+            scan = scans.setdefault(
+                barcode,
+                {
+                    "quantity": 0,
+                    "backend": entry_data.get("backend") or default_backend,
+                    "scanned_barcode": entry_data["barcode"].strip(),
+                },
+            )
+            scan["quantity"] += entry_data["quantity"]
+
+        if not scans:
+            _LOGGER.error("No barcodes provided")
+            return
+
+        _LOGGER.info("Scanning %d barcodes", len(scans))
+        added = await coordinator.async_add_scans(scans)
+        _LOGGER.info("Added %d of %d barcodes to batch", added, len(scans))
+
     async def handle_process_batch(call: ServiceCall) -> None:
         """Handle process_batch service call."""
         coordinator = get_coordinator()
-        item_overrides = call.data.get("item_overrides", {})
-
-        batch_items = coordinator.batch_manager.get_items()
+        item_overrides = {
+            canonicalize_barcode(barcode) or barcode: overrides
+            for barcode, overrides in call.data.get("item_overrides", {}).items()
+        }
+
+        # Scans still being enriched must be routed before they can be processed
+        await coordinator.enrichment.async_join()
+
+        # Items already booked, e.g. before a restart mid-run, or waiting in the
+        # outbox are not sent again
+        batch_items = [
+            item
+            for item in coordinator.batch_manager.get_items()
+            if item.status != "processed" and item not in coordinator.outbox
+        ]
         if not batch_items:
             _LOGGER.warning("No items in batch to process")
             return
 
         _LOGGER.info("Processing batch with %d items", len(batch_items))
 
-        results = []
+        # Apply overrides if provided
         for item in batch_items:
-            barcode = item.barcode
-            backend_type = item.backend
-
-            # Apply overrides if provided
-            if barcode in item_overrides:
-                overrides = item_overrides[barcode]
-                if "quantity" in overrides:
-                    item.quantity = overrides["quantity"]
-                if "pending_confirmation" in overrides:
-                    item.pending_confirmation = overrides["pending_confirmation"]
-
-            # Get backend
-            backend: BackendBase | None = coordinator.backends.get(backend_type)
-            if not backend:
-                _LOGGER.error("Backend %s not available for item %s", backend_type, barcode)
-                coordinator.batch_manager.update_item(
-                    barcode, {"status": "error", "error_message": f"Backend {backend_type} not available"}
-                )
-                results.append({"barcode": barcode, "success": False, "error": "Backend not available"})
+            overrides = item_overrides.get(item.barcode)
+            if not overrides:
                 continue
+            if "quantity" in overrides:
+                item.quantity = overrides["quantity"]
+            if "pending_confirmation" in overrides:
+                item.pending_confirmation = overrides["pending_confirmation"]
 
-            try:
-                if item.exists:
-                    # Add quantity to existing item
-                    success = await backend.add_quantity(barcode, item.quantity)
-                    if success:
-                        coordinator.batch_manager.update_item(barcode, {"status": "processed"})
-                        results.append({"barcode": barcode, "success": True, "action": "added_quantity"})
-                        _LOGGER.info("Added quantity %d to item %s", item.quantity, barcode)
-                    else:
-                        coordinator.batch_manager.update_item(
-                            barcode, {"status": "error", "error_message": "Failed to add quantity"}
-                        )
-                        results.append({"barcode": barcode, "success": False, "error": "Failed to add quantity"})
-                else:
-                    # Create new item
-                    item_data = {
-                        "barcode": barcode,
-                        "name": item.upc_data.get("title", "Unknown Item"),
-                        "description": item.upc_data.get("description", ""),
-                        "quantity": item.quantity,
-                    }
-                    # Merge pending confirmation data
-                    if item.pending_confirmation:
-                        item_data.update(item.pending_confirmation)
-
-                    success = await backend.create_item(item_data)
-                    if success:
-                        coordinator.batch_manager.update_item(barcode, {"status": "processed"})
-                        results.append({"barcode": barcode, "success": True, "action": "created_item"})
-                        _LOGGER.info("Created new item %s", barcode)
-                    else:
-                        coordinator.batch_manager.update_item(
-                            barcode, {"status": "error", "error_message": "Failed to create item"}
-                        )
-                        results.append({"barcode": barcode, "success": False, "error": "Failed to create item"})
-            except Exception as err:
-                _LOGGER.exception("Error processing item %s: %s", barcode, err)
-                coordinator.batch_manager.update_item(
-                    barcode, {"status": "error", "error_message": str(err)}
-                )
-                results.append({"barcode": barcode, "success": False, "error": str(err)})
+        results = await coordinator.processor.async_process(batch_items)
+        coordinator.last_results = results
 
         # Save batch state
-        await coordinator.batch_manager.save()
+        await coordinator.batch_manager.async_flush()
         await coordinator.async_request_refresh()
 
         _LOGGER.info("Batch processing complete: %d items processed", len(results))
 
+    async def handle_import_batch(call: ServiceCall) -> None:
+        """Handle import_batch service call."""
+        try:
+            await async_import_batch(
+                hass,
+                get_coordinator(),
+                call.data["filename"],
+                lookup=call.data["lookup"],
+                chunk_size=call.data["chunk_size"],
+                restart=call.data["restart"],
+            )
+        except TransferError as err:
+            _LOGGER.error("Error importing batch: %s", err)
+
+    async def handle_export_batch(call: ServiceCall) -> None:
+        """Handle export_batch service call."""
+        try:
+            await async_export_batch(
+                hass, get_coordinator(), call.data["filename"], source=call.data["source"]
+            )
+        except TransferError as err:
+            _LOGGER.error("Error exporting batch: %s", err)
+
+    async def handle_ingest_products(call: ServiceCall) -> None:
+        """Handle ingest_products service call."""
+        try:
+            await get_coordinator().product_db.async_ingest(
+                call.data["filename"], replace=call.data["replace"]
+            )
+        except TransferError as err:
+            _LOGGER.error("Error ingesting products: %s", err)
+
     async def handle_clear_batch(call: ServiceCall) -> None:
         """Handle clear_batch service call."""
         coordinator = get_coordinator()
         coordinator.batch_manager.clear()
-        await coordinator.batch_manager.save()
+        await coordinator.batch_manager.async_flush()
         await coordinator.async_request_refresh()
         _LOGGER.info("Batch cleared")
 
@@ -213,6 +290,13 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         schema=SCAN_BARCODE_SCHEMA,
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCAN_BARCODES,
+        handle_scan_barcodes,
+        schema=SCAN_BARCODES_SCHEMA,
+    )
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_PROCESS_BATCH,
@@ -220,6 +304,27 @@ async def async_setup_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
         schema=PROCESS_BATCH_SCHEMA,
     )
 
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_BATCH,
+        handle_import_batch,
+        schema=IMPORT_BATCH_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_BATCH,
+        handle_export_batch,
+        schema=EXPORT_BATCH_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_INGEST_PRODUCTS,
+        handle_ingest_products,
+        schema=INGEST_PRODUCTS_SCHEMA,
+    )
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_CLEAR_BATCH,
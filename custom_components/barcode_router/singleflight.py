@@ -0,0 +1,46 @@
+"""Coalescing of concurrent calls for the same key."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by their argument.
+
+    While a call for a key is running, further callers for the same key await
+    the running call instead of starting their own. Results are not kept once
+    the call finishes; caching is left to the caller.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def async_run(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run func for key, or join the call already running for key."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._discard(key, done))
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _discard(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        """Forget a finished call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._inflight)
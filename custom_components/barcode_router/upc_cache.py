@@ -0,0 +1,199 @@
+"""Persistent UPC lookup cache."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .barcode import canonicalize_barcode
+from .const import (
+    DEFAULT_UPC_CACHE_MAX_SIZE,
+    DEFAULT_UPC_CACHE_TTL_DAYS,
+    DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS,
+    UPC_CACHE_SAVE_DELAY,
+    UPC_CACHE_STORAGE_KEY,
+    UPC_CACHE_STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UpcCache:
+    """Bounded LRU cache of UPC lookup results persisted to disk.
+
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``max_size`` is exceeded. Barcodes the lookup service does not
+    know are remembered separately with their own, shorter ``negative_ttl``.
+    The stored data is only read on the first access so integration setup does
+    not wait on disk I/O.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_size: int = DEFAULT_UPC_CACHE_MAX_SIZE,
+        ttl: float = DEFAULT_UPC_CACHE_TTL_DAYS * 86400,
+        negative_ttl: float = DEFAULT_UPC_NEGATIVE_CACHE_TTL_HOURS * 3600,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._store = Store(hass, UPC_CACHE_STORAGE_VERSION, UPC_CACHE_STORAGE_KEY)
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # Barcodes known to be missing upstream, mapped to their expiry time
+        self._negative: OrderedDict[str, float] = OrderedDict()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.negative_hits = 0
+
+    async def _async_ensure_loaded(self) -> None:
+        """Load persisted entries on first use."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                data = await self._store.async_load()
+            except Exception as err:
+                _LOGGER.error("Error loading UPC cache: %s", err)
+                data = None
+
+            data = data or {}
+            now = time.time()
+            # Stored oldest first, so re-inserting keeps the LRU order. Entries
+            # saved before barcodes were canonicalized are keyed by the scanned
+            # form and move to the canonical key, the newest entry winning.
+            for entry in data.get("entries", []):
+                if entry.get("expires", 0) > now:
+                    entry["barcode"] = _cache_key(entry["barcode"])
+                    self._entries.pop(entry["barcode"], None)
+                    self._entries[entry["barcode"]] = entry
+            for barcode, expires in data.get("negative", {}).items():
+                barcode = _cache_key(barcode)
+                if expires > now and barcode not in self._entries:
+                    self._negative[barcode] = max(expires, self._negative.get(barcode, 0))
+            self._evict()
+            self._loaded = True
+            _LOGGER.debug("Loaded UPC cache with %d entries", len(self._entries))
+
+    async def async_get(self, barcode: str) -> dict[str, Any] | None:
+        """Return the cached result for a barcode, if present and fresh."""
+        await self._async_ensure_loaded()
+        entry = self._entries.get(barcode)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry["expires"] <= time.time():
+            del self._entries[barcode]
+            self.expirations += 1
+            self.misses += 1
+            self._schedule_save()
+            return None
+
+        self._entries.move_to_end(barcode)
+        self.hits += 1
+        return entry["result"]
+
+    async def async_set(self, barcode: str, result: dict[str, Any]) -> None:
+        """Store a lookup result."""
+        await self._async_ensure_loaded()
+        self._entries[barcode] = {
+            "barcode": barcode,
+            "result": result,
+            "expires": time.time() + self.ttl,
+        }
+        self._entries.move_to_end(barcode)
+        self._negative.pop(barcode, None)
+        self._evict()
+        self._schedule_save()
+
+    async def async_is_known_missing(self, barcode: str) -> bool:
+        """Return True if the barcode was recently reported as not found."""
+        await self._async_ensure_loaded()
+        expires = self._negative.get(barcode)
+        if expires is None:
+            return False
+
+        if expires <= time.time():
+            del self._negative[barcode]
+            self.expirations += 1
+            self._schedule_save()
+            return False
+
+        self._negative.move_to_end(barcode)
+        self.negative_hits += 1
+        return True
+
+    async def async_set_missing(self, barcode: str) -> None:
+        """Remember that the lookup service does not know a barcode."""
+        await self._async_ensure_loaded()
+        self._entries.pop(barcode, None)
+        self._negative[barcode] = time.time() + self.negative_ttl
+        self._negative.move_to_end(barcode)
+        self._evict()
+        self._schedule_save()
+
+    async def async_clear(self) -> None:
+        """Remove all cached entries."""
+        await self._async_ensure_loaded()
+        self._entries.clear()
+        self._negative.clear()
+        self._schedule_save()
+        _LOGGER.debug("UPC lookup cache cleared")
+
+    async def async_flush(self) -> None:
+        """Write pending changes to disk immediately."""
+        if self._loaded:
+            await self._store.async_save(self._data_to_save())
+
+    def _evict(self) -> None:
+        """Drop least recently used entries above the size limit."""
+        for entries in (self._entries, self._negative):
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def _schedule_save(self) -> None:
+        """Persist the cache after a short delay."""
+        self._store.async_delay_save(self._data_to_save, UPC_CACHE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "entries": list(self._entries.values()),
+            "negative": dict(self._negative),
+        }
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "negative_size": len(self._negative),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "negative_hits": self.negative_hits,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+def _cache_key(barcode: str) -> str:
+    """Return the canonical key of a stored barcode."""
+    return canonicalize_barcode(barcode) or barcode
@@ -1,80 +1,343 @@
-"""UPC lookup service using upcitemdb.com."""
+"""UPC lookup through a chain of online providers."""
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+import asyncio
+from collections import deque
 import logging
+import time
 from typing import Any
 
 import aiohttp
 
-from .const import UPC_LOOKUP_API_URL
+from .const import (
+    HTTP_REQUEST_TIMEOUT,
+    LOOKUP_HEDGE_DELAY_DEFAULT,
+    LOOKUP_HEDGE_DELAY_MIN,
+    LOOKUP_LATENCY_WINDOW,
+    OPEN_FOOD_FACTS_API_URL,
+    UPC_LOOKUP_API_URL,
+)
+from .http_session import HttpSessionManager
+from .product_db import ProductDatabase
+from .upc_cache import UpcCache
 
 _LOGGER = logging.getLogger(__name__)
 
-# Cache for UPC lookups
-_upc_cache: dict[str, dict[str, Any]] = {}
 
+class LookupProvider(ABC):
+    """Abstract base class for online barcode lookup providers."""
 
-async def lookup_barcode(barcode: str, use_cache: bool = True) -> dict[str, Any] | None:
-    """Lookup barcode information from upcitemdb.com.
+    name: str
 
-    Args:
-        barcode: The barcode to lookup
-        use_cache: Whether to use cached results
+    @abstractmethod
+    async def async_lookup(
+        self, barcode: str, session: aiohttp.ClientSession
+    ) -> dict[str, Any] | None:
+        """Look up a barcode.
 
-    Returns:
-        Dictionary with product information or None if not found
+        Returns:
+            Product information, or None if the provider does not know the
+            barcode. Failures, including rate limiting, raise instead so they
+            are not mistaken for an unknown barcode.
+        """
+
+
+class UpcItemDbProvider(LookupProvider):
+    """Lookup provider for upcitemdb.com."""
+
+    name = "upcitemdb"
+
+    async def async_lookup(
+        self, barcode: str, session: aiohttp.ClientSession
+    ) -> dict[str, Any] | None:
+        """Look up a barcode on upcitemdb.com."""
+        async with session.get(
+            UPC_LOOKUP_API_URL,
+            params={"upc": barcode},
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+
+        items = data.get("items", [])
+        if not items:
+            return None
+
+        # Use the first item
+        item = items[0]
+        return {
+            "barcode": barcode,
+            "title": item.get("title", ""),
+            "brand": item.get("brand", ""),
+            "model": item.get("model", ""),
+            "category": item.get("category", ""),
+            "description": item.get("description", ""),
+            "images": item.get("images", []),
+            "offers": item.get("offers", []),
+        }
+
+
+class OpenFoodFactsProvider(LookupProvider):
+    """Lookup provider for the Open Food Facts product API."""
+
+    name = "openfoodfacts"
+
+    async def async_lookup(
+        self, barcode: str, session: aiohttp.ClientSession
+    ) -> dict[str, Any] | None:
+        """Look up a barcode on Open Food Facts."""
+        async with session.get(
+            OPEN_FOOD_FACTS_API_URL.format(barcode=barcode),
+            params={"fields": "product_name,brands,categories,generic_name,image_url"},
+            headers={"User-Agent": "HomeAssistant-BarcodeRouter"},
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+        ) as response:
+            # Unknown products are answered with a 404
+            if response.status == 404:
+                return None
+            response.raise_for_status()
+            data = await response.json()
+
+        product = data.get("product") or {}
+        if data.get("status") != 1 or not product.get("product_name"):
+            return None
+        return {
+            "barcode": barcode,
+            "title": product["product_name"],
+            "brand": (product.get("brands") or "").split(",")[0].strip(),
+            "model": "",
+            "category": product.get("categories") or "",
+            "description": product.get("generic_name") or "",
+            "images": [product["image_url"]] if product.get("image_url") else [],
+            "offers": [],
+        }
+
+
+LOOKUP_PROVIDERS: dict[str, type[LookupProvider]] = {
+    UpcItemDbProvider.name: UpcItemDbProvider,
+    OpenFoodFactsProvider.name: OpenFoodFactsProvider,
+}
+
+
+class ProviderStats:
+    """Latency and outcome counters of one provider over a sliding window."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.latencies: deque[float] = deque(maxlen=LOOKUP_LATENCY_WINDOW)
+        self.outcomes: deque[bool] = deque(maxlen=LOOKUP_LATENCY_WINDOW)
+        self.calls = 0
+        self.found = 0
+        self.not_found = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record a finished call; ok is False if the provider failed."""
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a latency percentile over the window, in seconds."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    @property
+    def success_rate(self) -> float:
+        """Return the share of recent calls that did not fail."""
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def hedge_delay(self) -> float:
+        """Return how long to wait for this provider before starting the next."""
+        p95 = self.percentile(0.95)
+        if p95 is None:
+            return LOOKUP_HEDGE_DELAY_DEFAULT
+        return min(max(p95, LOOKUP_HEDGE_DELAY_MIN), HTTP_REQUEST_TIMEOUT)
+
+    @property
+    def expected_latency(self) -> float:
+        """Return p95 latency weighted by failure rate, used for ordering."""
+        p95 = self.percentile(0.95)
+        if p95 is None:
+            p95 = LOOKUP_HEDGE_DELAY_DEFAULT
+        return p95 / max(self.success_rate, 0.05)
+
+
+class LookupChain:
+    """Barcode lookup through the cache, the local database and online providers.
+
+    Local sources are checked in turn. Online providers are hedged: the first
+    one is started, and if it has not answered within its p95 latency the next
+    one is started alongside it, and so on. The first provider to find the
+    product wins and the others are cancelled. A provider that fails or does
+    not know the barcode starts the next one at once. Providers are reordered
+    by their recent latency and failure rate before every lookup.
     """
-    # Check cache first
-    if use_cache and barcode in _upc_cache:
-        _LOGGER.debug("Using cached result for barcode: %s", barcode)
-        return _upc_cache[barcode]
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                UPC_LOOKUP_API_URL,
-                params={"upc": barcode},
-                timeout=aiohttp.ClientTimeout(total=10),
-            ) as response:
-                if response.status != 200:
-                    _LOGGER.warning("UPC lookup returned status %d for barcode: %s", response.status, barcode)
-                    return None
-
-                data = await response.json()
-                items = data.get("items", [])
-
-                if not items:
-                    _LOGGER.debug("No items found for barcode: %s", barcode)
-                    return None
-
-                # Use the first item
-                item = items[0]
-                result = {
-                    "barcode": barcode,
-                    "title": item.get("title", ""),
-                    "brand": item.get("brand", ""),
-                    "model": item.get("model", ""),
-                    "category": item.get("category", ""),
-                    "description": item.get("description", ""),
-                    "images": item.get("images", []),
-                    "offers": item.get("offers", []),
-                }
-
-                # Cache the result
-                if use_cache:
-                    _upc_cache[barcode] = result
-
-                return result
-    except aiohttp.ClientError as err:
-        _LOGGER.error("Error looking up barcode %s: %s", barcode, err)
-        return None
-    except Exception as err:
-        _LOGGER.exception("Unexpected error looking up barcode %s: %s", barcode, err)
-        return None
-
-
-def clear_cache() -> None:
-    """Clear the UPC lookup cache."""
-    global _upc_cache
-    _upc_cache.clear()
-    _LOGGER.debug("UPC lookup cache cleared")
+
+    def __init__(
+        self,
+        session_manager: HttpSessionManager,
+        providers: list[LookupProvider],
+        cache: UpcCache | None = None,
+        product_db: ProductDatabase | None = None,
+    ) -> None:
+        """Initialize the chain."""
+        self.session_manager = session_manager
+        self.providers = providers
+        self.cache = cache
+        self.product_db = product_db
+        self._stats = {provider.name: ProviderStats() for provider in providers}
+        self.hedges = 0
+
+    async def async_lookup(self, barcode: str, use_cache: bool = True) -> dict[str, Any] | None:
+        """Look up a barcode.
+
+        The barcode is cached as a miss only when every provider answered that
+        it is unknown. Failures are not cached, so an outage is retried on the
+        next scan.
+
+        Returns:
+            Dictionary with product information or None if not found
+        """
+        use_cache = use_cache and self.cache is not None
+
+        # Check cache first
+        if use_cache:
+            cached = await self.cache.async_get(barcode)
+            if cached is not None:
+                _LOGGER.debug("Using cached result for barcode: %s", barcode)
+                return cached
+
+        if self.product_db is not None:
+            local = await self.product_db.async_get(barcode)
+            if local is not None:
+                _LOGGER.debug("Found barcode %s in local product database", barcode)
+                return local
+
+        if use_cache and await self.cache.async_is_known_missing(barcode):
+            _LOGGER.debug("Barcode %s is cached as not found", barcode)
+            return None
+
+        result, all_answered = await self._async_lookup_online(barcode)
+        if use_cache:
+            if result is not None:
+                await self.cache.async_set(barcode, result)
+            elif all_answered:
+                await self.cache.async_set_missing(barcode)
+        return result
+
+    async def _async_lookup_online(self, barcode: str) -> tuple[dict[str, Any] | None, bool]:
+        """Run the hedged provider race.
+
+        Returns:
+            Tuple of the result and whether every provider answered without
+            failing
+        """
+        providers = sorted(self.providers, key=lambda p: self._stats[p.name].expected_latency)
+        session = self.session_manager.session
+        pending: set[asyncio.Task[dict[str, Any] | None]] = set()
+        # Without providers nothing answered, so the miss must not be cached
+        all_answered = bool(providers)
+        next_index = 0
+
+        try:
+            while next_index < len(providers) or pending:
+                timeout = None
+                if next_index < len(providers):
+                    provider = providers[next_index]
+                    next_index += 1
+                    if pending:
+                        self.hedges += 1
+                        _LOGGER.debug("Hedging lookup of %s with %s", barcode, provider.name)
+                    pending.add(asyncio.ensure_future(self._async_call(provider, barcode, session)))
+                    if next_index < len(providers):
+                        timeout = self._stats[provider.name].hedge_delay
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        all_answered = False
+                    elif task.result() is not None:
+                        return task.result(), True
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return None, all_answered
+
+    async def _async_call(
+        self, provider: LookupProvider, barcode: str, session: aiohttp.ClientSession
+    ) -> dict[str, Any] | None:
+        """Call one provider and record its latency and outcome."""
+        stats = self._stats[provider.name]
+        stats.calls += 1
+        start = time.monotonic()
+        try:
+            result = await provider.async_lookup(barcode, session)
+        except asyncio.CancelledError:
+            # Lost the race, so its latency is only known to be longer than
+            # this. It is recorded as at least its hedge delay, its p95 or the
+            # default without samples, so a provider that keeps losing never
+            # looks faster than it was.
+            stats.cancelled += 1
+            stats.latencies.append(max(time.monotonic() - start, stats.hedge_delay))
+            raise
+        except Exception as err:
+            stats.errors += 1
+            stats.record(time.monotonic() - start, False)
+            if isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError, ValueError)):
+                _LOGGER.warning("Lookup of %s on %s failed: %s", barcode, provider.name, err)
+            else:
+                _LOGGER.exception("Unexpected error looking up %s on %s", barcode, provider.name)
+            raise
+
+        stats.record(time.monotonic() - start, True)
+        if result is None:
+            stats.not_found += 1
+            _LOGGER.debug("No items found for barcode %s on %s", barcode, provider.name)
+        else:
+            stats.found += 1
+        return result
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return per-provider statistics, in the current chain order."""
+        providers = sorted(self.providers, key=lambda p: self._stats[p.name].expected_latency)
+        result: dict[str, Any] = {"hedges": self.hedges, "providers": {}}
+        for order, provider in enumerate(providers):
+            stats = self._stats[provider.name]
+            p50, p95 = stats.percentile(0.5), stats.percentile(0.95)
+            result["providers"][provider.name] = {
+                "order": order,
+                "calls": stats.calls,
+                "found": stats.found,
+                "not_found": stats.not_found,
+                "errors": stats.errors,
+                "cancelled": stats.cancelled,
+                "success_rate": round(stats.success_rate, 3),
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "hedge_delay_ms": round(stats.hedge_delay * 1000),
+            }
+        return result
+
+
+def create_providers(names: str) -> list[LookupProvider]:
+    """Create the providers named in a comma separated list, skipping unknown ones."""
+    providers: list[LookupProvider] = []
+    for name in dict.fromkeys(name.strip().lower() for name in names.split(",")):
+        if not name:
+            continue
+        if name not in LOOKUP_PROVIDERS:
+            _LOGGER.warning("Ignoring unknown lookup provider: %s", name)
+            continue
+        providers.append(LOOKUP_PROVIDERS[name]())
+    return providers
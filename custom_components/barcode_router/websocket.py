@@ -0,0 +1,63 @@
+"""Websocket API for Barcode Router."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, WS_TYPE_SUBSCRIBE
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to batch changes.
+
+    Sends a snapshot of the batch first, then one delta event per item-level
+    change. Every event carries the batch version so clients can detect gaps
+    and resubscribe.
+    """
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = msg.get("entry_id") or next(iter(coordinators), None)
+    coordinator = coordinators.get(entry_id)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Barcode Router is not set up")
+        return
+
+    batch_manager = coordinator.batch_manager
+
+    @callback
+    def forward_delta(delta: dict[str, Any]) -> None:
+        """Forward a batch change to the client."""
+        connection.send_message(websocket_api.event_message(msg["id"], delta))
+
+    connection.subscriptions[msg["id"]] = batch_manager.async_add_listener(forward_delta)
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {
+                "type": "snapshot",
+                "version": batch_manager.version,
+                "batch": batch_manager.get_batch_data(),
+            },
+        )
+    )
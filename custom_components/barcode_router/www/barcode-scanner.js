@@ -1,27 +1,148 @@
 /* eslint-disable @typescript-eslint/no-this-alias */
 /* eslint-disable @typescript-eslint/no-explicit-any */
+
+// Rows have a fixed height so only the visible ones need to be in the DOM
+const ROW_HEIGHT = 88;
+const ROW_OVERSCAN = 5;
+
+// Scans are queued locally and sent in batches so the input never blocks
+const PENDING_SCANS_KEY = "barcode_router_pending_scans";
+const MAX_SCANS_PER_CALL = 50;
+const MAX_CALLS_IN_FLIGHT = 2;
+const MAX_RETRY_DELAY = 30000;
+const SHOWN_SCANS = 8;
+
+// home-assistant-js-websocket rejects with a numeric code when the connection
+// fails; errors returned by Home Assistant itself carry a string code
+function isConnectionError(error) {
+  return !error || typeof error.code !== "string";
+}
+
 class BarcodeScannerCard extends HTMLElement {
   setConfig(config) {
     this.config = config;
   }
 
   set hass(hass) {
+    const firstHass = !this._hass;
     this._hass = hass;
+    if (!this._unsubscribe && !this._subscribing) {
+      this.subscribe();
+    }
     this.updateCard();
+    this.watchConnection(hass.connection);
+    if (firstHass) {
+      this.restoreScanQueue();
+    }
+  }
+
+  connectedCallback() {
+    if (this._hass && !this._unsubscribe && !this._subscribing) {
+      this.subscribe();
+    }
+    if (this._hass) {
+      this.watchConnection(this._hass.connection);
+    }
+  }
+
+  disconnectedCallback() {
+    this.unsubscribe();
+    this.unwatchConnection();
+  }
+
+  // Send queued scans as soon as the websocket reconnects
+  watchConnection(connection) {
+    if (connection === this._connection) return;
+    this.unwatchConnection();
+    this._onReady = this._onReady || (() => this.handleReconnect());
+    connection.addEventListener("ready", this._onReady);
+    this._connection = connection;
+  }
+
+  unwatchConnection() {
+    if (this._connection) {
+      this._connection.removeEventListener("ready", this._onReady);
+      this._connection = null;
+    }
+  }
+
+  handleReconnect() {
+    // The connection is back, so the backoff no longer applies
+    clearTimeout(this._retryTimer);
+    this._retryTimer = null;
+    this._retryDelay = 0;
+    this.flushScanQueue();
+  }
+
+  // Subscribe to batch changes: a snapshot first, then item-level deltas
+  async subscribe() {
+    this._subscribing = true;
+    try {
+      this._unsubscribe = await this._hass.connection.subscribeMessage(
+        (event) => this.handleBatchEvent(event),
+        { type: "barcode_router/subscribe" }
+      );
+    } catch (error) {
+      this.showStatus(`Error subscribing to batch: ${error.message}`, "error");
+    } finally {
+      this._subscribing = false;
+    }
+  }
+
+  unsubscribe() {
+    if (this._unsubscribe) {
+      this._unsubscribe();
+      this._unsubscribe = null;
+    }
+  }
+
+  resubscribe() {
+    this.unsubscribe();
+    this.subscribe();
+  }
+
+  handleBatchEvent(event) {
+    if (event.type === "snapshot") {
+      this._items = new Map(
+        (event.batch.items || []).map((item) => [item.barcode, item])
+      );
+      this._version = event.version;
+    } else if (event.type === "closed") {
+      // The integration was reloaded; subscribe to the new batch
+      this.unsubscribe();
+      setTimeout(() => this.subscribe(), 1000);
+      return;
+    } else if (event.type === "delta") {
+      if (event.version <= this._version) return;
+      if (event.version !== this._version + 1) {
+        // Missed a change; start over from a fresh snapshot
+        this.resubscribe();
+        return;
+      }
+      this._version = event.version;
+      if (event.change === "cleared") {
+        this._items.clear();
+      } else if (event.change === "removed") {
+        this._items.delete(event.barcode);
+      } else if (event.item) {
+        this._items.set(event.barcode, event.item);
+      }
+    }
+    this.updateCard();
+  }
+
+  getBatchItems() {
+    return this._items ? Array.from(this._items.values()) : [];
   }
 
   async updateCard() {
     if (!this._hass) return;
 
-    // Get batch data from coordinator
-    const domain = "barcode_router";
-    const domainData = this._hass.data[domain] || {};
-    // Get first entry's coordinator (in most cases there's only one)
-    const entryId = Object.keys(domainData)[0];
-    const coordinator = entryId ? domainData[entryId] : null;
-    const coordinatorData = coordinator?.data || {};
-    const batchData = coordinatorData.batch || { items: [], mode: "batch" };
-    const items = batchData.items || [];
+    // The hass setter fires on every state change; only render batch changes
+    if (this.content && this._renderedVersion === this._version) return;
+    this._renderedVersion = this._version;
+
+    const items = this.getBatchItems();
 
     if (!this.content) {
       this.innerHTML = `
@@ -47,10 +168,13 @@ class BarcodeScannerCard extends HTMLElement {
                 <button id="scan-btn" class="scan-button">Scan</button>
               </div>
               <div id="scan-status" class="status-message"></div>
+              <div id="scan-queue" class="scan-queue"></div>
             </div>
             <div class="batch-section" id="batch-section" style="display: none;">
               <h3>Batch Review</h3>
-              <div id="batch-items"></div>
+              <div id="batch-items" class="batch-items">
+                <div class="batch-items-spacer"></div>
+              </div>
               <div class="batch-actions">
                 <button id="process-btn" class="process-button">Process Batch</button>
                 <button id="clear-btn" class="clear-button">Clear Batch</button>
@@ -115,34 +239,24 @@ class BarcodeScannerCard extends HTMLElement {
 
     // Refresh
     if (refreshBtn) {
-      refreshBtn.addEventListener("click", () => this.updateCard());
+      refreshBtn.addEventListener("click", () => this.resubscribe());
     }
 
-    // Auto-refresh every 5 seconds if there are items in batch
-    if (this._refreshInterval) {
-      clearInterval(this._refreshInterval);
+    // Render newly visible rows while scrolling
+    const batchItemsEl = this.querySelector("#batch-items");
+    if (batchItemsEl) {
+      batchItemsEl.addEventListener("scroll", () => {
+        if (this._scrollFrame) return;
+        this._scrollFrame = requestAnimationFrame(() => {
+          this._scrollFrame = null;
+          this.updateBatchItems(this.getBatchItems());
+        });
+      });
     }
-    this._refreshInterval = setInterval(() => {
-      const items = this.getBatchItems();
-      if (items.length > 0) {
-        this.updateCard();
-      }
-    }, 5000);
-  }
-
-  getBatchItems() {
-    const domain = "barcode_router";
-    const domainData = this._hass?.data[domain] || {};
-    const entryId = Object.keys(domainData)[0];
-    const coordinator = entryId ? domainData[entryId] : null;
-    const coordinatorData = coordinator?.data || {};
-    const batchData = coordinatorData.batch || { items: [], mode: "batch" };
-    return batchData.items || [];
   }
 
-  async handleScan() {
+  handleScan() {
     const barcodeInput = this.querySelector("#barcode-input");
-    const statusEl = this.querySelector("#scan-status");
     const barcode = barcodeInput?.value.trim();
 
     if (!barcode) {
@@ -150,28 +264,140 @@ class BarcodeScannerCard extends HTMLElement {
       return;
     }
 
-    this.showStatus("Scanning...", "info");
-    const scanBtn = this.querySelector("#scan-btn");
-    if (scanBtn) scanBtn.disabled = true;
+    // Accept the scan immediately and keep the input ready for the next one
+    if (barcodeInput) {
+      barcodeInput.value = "";
+      barcodeInput.focus();
+    }
+    this._scanId = (this._scanId || 0) + 1;
+    this._scans.push({ id: `${Date.now()}-${this._scanId}`, barcode, state: "pending" });
+    this.saveScanQueue();
+    this.renderScanQueue();
+    this.flushScanQueue();
+  }
+
+  // Load scans that were not acknowledged before the page was closed
+  restoreScanQueue() {
+    this._scans = this._scans || [];
+    this._callsInFlight = 0;
+    this._retryDelay = 0;
+    try {
+      const stored = JSON.parse(localStorage.getItem(PENDING_SCANS_KEY) || "[]");
+      for (const scan of stored) {
+        this._scans.push({ ...scan, state: "pending" });
+      }
+    } catch (error) {
+      localStorage.removeItem(PENDING_SCANS_KEY);
+    }
+    this.renderScanQueue();
+    this.flushScanQueue();
+  }
 
+  saveScanQueue() {
+    const unacknowledged = this._scans
+      .filter((scan) => scan.state === "pending" || scan.state === "sending")
+      .map(({ id, barcode }) => ({ id, barcode }));
     try {
-      await this._hass.callService("barcode_router", "scan_barcode", {
-        barcode: barcode,
-      });
+      localStorage.setItem(PENDING_SCANS_KEY, JSON.stringify(unacknowledged));
+    } catch (error) {
+      // Storage full or disabled; scans are still sent while the page is open
+    }
+  }
 
-      this.showStatus(`Scanned: ${barcode}`, "success");
-      if (barcodeInput) {
-        barcodeInput.value = "";
-        barcodeInput.focus();
-      }
+  // Send pending scans in batches, with a limited number of calls in flight
+  flushScanQueue() {
+    if (!this._hass || this._retryTimer) return;
+
+    while (this._callsInFlight < MAX_CALLS_IN_FLIGHT) {
+      const pending = this._scans.filter((scan) => scan.state === "pending");
+      if (pending.length === 0) return;
+      // Scans of a rejected batch are sent one at a time to find the bad one
+      const batch = pending[0].isolated
+        ? [pending[0]]
+        : pending.filter((scan) => !scan.isolated).slice(0, MAX_SCANS_PER_CALL);
+      batch.forEach((scan) => (scan.state = "sending"));
+      this.renderScanQueue();
+      this.sendScans(batch);
+    }
+  }
 
-      // Refresh card
-      setTimeout(() => this.updateCard(), 500);
+  async sendScans(batch) {
+    this._callsInFlight++;
+    try {
+      if (batch.length === 1) {
+        await this._hass.callService("barcode_router", "scan_barcode", {
+          barcode: batch[0].barcode,
+        });
+      } else {
+        await this._hass.callService("barcode_router", "scan_barcodes", {
+          barcodes: batch.map((scan) => scan.barcode),
+        });
+      }
+      batch.forEach((scan) => (scan.state = "acknowledged"));
+      this._retryDelay = 0;
     } catch (error) {
-      this.showStatus(`Error: ${error.message}`, "error");
+      if (!isConnectionError(error)) {
+        // Home Assistant rejected the call; sending it again will not help
+        if (batch.length > 1) {
+          batch.forEach((scan) => Object.assign(scan, { state: "pending", isolated: true }));
+        } else {
+          Object.assign(batch[0], { state: "failed", error: error.message });
+          this.showStatus(`Scan ${batch[0].barcode} rejected: ${error.message}`, "error");
+        }
+        return;
+      }
+      // Keep the scans and retry with backoff; they survive a page reload
+      batch.forEach((scan) => (scan.state = "pending"));
+      this._retryDelay = Math.min((this._retryDelay || 1000) * 2, MAX_RETRY_DELAY);
+      this.showStatus(`Scan queued, HA unreachable: ${error.message}`, "error");
+      if (!this._retryTimer) {
+        this._retryTimer = setTimeout(() => {
+          this._retryTimer = null;
+          this.flushScanQueue();
+        }, this._retryDelay);
+      }
     } finally {
-      const scanBtn = this.querySelector("#scan-btn");
-      if (scanBtn) scanBtn.disabled = false;
+      this._callsInFlight--;
+      this.pruneScanQueue();
+      this.saveScanQueue();
+      this.renderScanQueue();
+      this.flushScanQueue();
+    }
+  }
+
+  pruneScanQueue() {
+    // Keep every unsent scan but only the most recent finished ones
+    let finished = 0;
+    for (let index = this._scans.length - 1; index >= 0; index--) {
+      const state = this._scans[index].state;
+      if (state !== "acknowledged" && state !== "failed") continue;
+      finished++;
+      if (finished > SHOWN_SCANS) this._scans.splice(index, 1);
+    }
+  }
+
+  renderScanQueue() {
+    const queueEl = this.querySelector("#scan-queue");
+    if (!queueEl) return;
+
+    const recent = this._scans.slice(-SHOWN_SCANS);
+    queueEl.replaceChildren(
+      ...recent.map((scan) => {
+        const chip = document.createElement("span");
+        chip.className = `scan-chip ${scan.state}`;
+        chip.textContent = scan.barcode;
+        chip.title = scan.error ? `${scan.state}: ${scan.error}` : scan.state;
+        return chip;
+      })
+    );
+    const hidden = this._scans
+      .slice(0, -SHOWN_SCANS)
+      .filter((scan) => scan.state === "pending" || scan.state === "sending").length;
+    if (hidden > 0) {
+      const more = document.createElement("span");
+      more.className = "scan-chip pending";
+      more.textContent = `+${hidden} queued`;
+      queueEl.prepend(more);
     }
   }
 
@@ -182,7 +408,6 @@ class BarcodeScannerCard extends HTMLElement {
     try {
       await this._hass.callService("barcode_router", "process_batch", {});
       this.showStatus("Batch processed successfully!", "success");
-      setTimeout(() => this.updateCard(), 1000);
     } catch (error) {
       this.showStatus(`Error processing batch: ${error.message}`, "error");
     } finally {
@@ -196,46 +421,103 @@ class BarcodeScannerCard extends HTMLElement {
     try {
       await this._hass.callService("barcode_router", "clear_batch", {});
       this.showStatus("Batch cleared", "info");
-      setTimeout(() => this.updateCard(), 500);
     } catch (error) {
       this.showStatus(`Error clearing batch: ${error.message}`, "error");
     }
   }
 
+  // Patch only the rows that are visible and have changed, keyed by barcode
   updateBatchItems(items) {
     const batchItemsEl = this.querySelector("#batch-items");
-    if (!batchItemsEl) return;
+    const spacer = this.querySelector(".batch-items-spacer");
+    if (!batchItemsEl || !spacer) return;
+    if (!this._rows) this._rows = new Map();
+
+    spacer.style.height = `${items.length * ROW_HEIGHT}px`;
+
+    const viewHeight = batchItemsEl.clientHeight || ROW_HEIGHT * 10;
+    const first = Math.max(0, Math.floor(batchItemsEl.scrollTop / ROW_HEIGHT) - ROW_OVERSCAN);
+    const last = Math.min(
+      items.length,
+      Math.ceil((batchItemsEl.scrollTop + viewHeight) / ROW_HEIGHT) + ROW_OVERSCAN
+    );
+
+    const visible = new Set();
+    for (let index = first; index < last; index++) {
+      const item = items[index];
+      visible.add(item.barcode);
+
+      let row = this._rows.get(item.barcode);
+      if (!row) {
+        row = { el: this.createRow(), key: null, index: null };
+        spacer.appendChild(row.el);
+        this._rows.set(item.barcode, row);
+      }
+      if (row.index !== index) {
+        row.el.style.top = `${index * ROW_HEIGHT}px`;
+        row.index = index;
+      }
+      const key = JSON.stringify([
+        item.upc_data?.title,
+        item.exists,
+        item.backend,
+        item.status,
+        item.quantity,
+        item.error_message,
+      ]);
+      if (row.key !== key) {
+        this.patchRow(row.el, item);
+        row.key = key;
+      }
+    }
 
-    if (items.length === 0) {
-      batchItemsEl.innerHTML = "<p>No items in batch</p>";
-      return;
+    for (const [barcode, row] of this._rows) {
+      if (!visible.has(barcode)) {
+        row.el.remove();
+        this._rows.delete(barcode);
+      }
     }
+  }
 
-    batchItemsEl.innerHTML = items
-      .map((item, index) => {
-        const upcData = item.upc_data || {};
-        const title = upcData.title || item.barcode;
-        const backend = item.backend || "unknown";
-        const exists = item.exists ? "✓ Exists" : "✗ New";
-        const status = item.status || "pending";
-        const quantity = item.quantity || 1;
-
-        return `
-          <div class="batch-item ${status}" data-index="${index}">
-            <div class="item-header">
-              <span class="item-title">${title}</span>
-              <span class="item-badge ${item.exists ? "exists" : "new"}">${exists}</span>
-            </div>
-            <div class="item-details">
-              <span class="item-barcode">${item.barcode}</span>
-              <span class="item-backend">${backend}</span>
-              <span class="item-quantity">Qty: ${quantity}</span>
-            </div>
-            ${status === "error" ? `<div class="error-message">${item.error_message || "Error"}</div>` : ""}
-          </div>
-        `;
-      })
-      .join("");
+  createRow() {
+    const el = document.createElement("div");
+    el.innerHTML = `
+      <div class="item-header">
+        <span class="item-title"></span>
+        <span class="item-badge"></span>
+      </div>
+      <div class="item-details">
+        <span class="item-barcode"></span>
+        <span class="item-backend"></span>
+        <span class="item-quantity"></span>
+      </div>
+      <div class="error-message"></div>
+    `;
+    return el;
+  }
+
+  patchRow(el, item) {
+    const upcData = item.upc_data || {};
+    const status = item.status || "pending";
+
+    el.className = `batch-item ${status}`;
+    el.querySelector(".item-title").textContent = upcData.title || item.barcode;
+    const badge = el.querySelector(".item-badge");
+    if (status === "unresolved") {
+      badge.className = "item-badge unresolved";
+      badge.textContent = "? Unchecked";
+    } else {
+      badge.className = `item-badge ${item.exists ? "exists" : "new"}`;
+      badge.textContent = item.exists ? "✓ Exists" : "✗ New";
+    }
+    el.querySelector(".item-barcode").textContent = item.barcode;
+    el.querySelector(".item-backend").textContent = item.backend || "unknown";
+    el.querySelector(".item-quantity").textContent = `Qty: ${item.quantity || 1}`;
+    let message = "";
+    if (status === "error") message = item.error_message || "Error";
+    if (status === "queued") message = "Queued until the backend is available";
+    if (status === "unresolved") message = "Backend unreachable; checked again when processed";
+    el.querySelector(".error-message").textContent = message;
   }
 
   showStatus(message, type = "info") {
@@ -349,14 +631,53 @@ style.textContent = `
     background-color: var(--info-color, #2196f3);
     color: white;
   }
+  .scan-queue {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 4px;
+    margin-top: 8px;
+  }
+  .scan-chip {
+    padding: 2px 8px;
+    border-radius: 12px;
+    font-size: 0.8em;
+    border: 1px solid var(--divider-color);
+  }
+  .scan-chip.pending {
+    border-style: dashed;
+    color: var(--secondary-text-color);
+  }
+  .scan-chip.sending {
+    color: var(--info-color, #2196f3);
+  }
+  .scan-chip.acknowledged {
+    background-color: var(--success-color, #4caf50);
+    color: white;
+  }
+  .scan-chip.failed {
+    background-color: var(--error-color, #f44336);
+    color: white;
+  }
   .batch-section {
     margin-top: 24px;
     padding-top: 24px;
     border-top: 1px solid var(--divider-color);
   }
+  .batch-items {
+    max-height: 60vh;
+    overflow-y: auto;
+  }
+  .batch-items-spacer {
+    position: relative;
+  }
   .batch-item {
+    position: absolute;
+    left: 0;
+    right: 0;
+    height: 80px;
+    box-sizing: border-box;
+    overflow: hidden;
     padding: 12px;
-    margin-bottom: 8px;
     border: 1px solid var(--divider-color);
     border-radius: 4px;
     background-color: var(--card-background-color);
@@ -364,9 +685,15 @@ style.textContent = `
   .batch-item.processed {
     opacity: 0.6;
   }
+  .batch-item.enriching {
+    border-style: dashed;
+  }
   .batch-item.error {
     border-color: var(--error-color, #f44336);
   }
+  .batch-item.queued {
+    border-color: var(--warning-color, #ff9800);
+  }
   .item-header {
     display: flex;
     justify-content: space-between;
@@ -375,6 +702,9 @@ style.textContent = `
   }
   .item-title {
     font-weight: 500;
+    white-space: nowrap;
+    overflow: hidden;
+    text-overflow: ellipsis;
   }
   .item-badge {
     padding: 2px 8px;
@@ -389,6 +719,10 @@ style.textContent = `
     background-color: var(--warning-color, #ff9800);
     color: white;
   }
+  .item-badge.unresolved {
+    background-color: var(--disabled-color, #9e9e9e);
+    color: white;
+  }
   .item-details {
     display: flex;
     gap: 12px;
@@ -396,9 +730,12 @@ style.textContent = `
     color: var(--secondary-text-color);
   }
   .error-message {
-    margin-top: 8px;
+    margin-top: 4px;
     color: var(--error-color, #f44336);
     font-size: 0.9em;
+    white-space: nowrap;
+    overflow: hidden;
+    text-overflow: ellipsis;
   }
   .batch-actions {
     display: flex;
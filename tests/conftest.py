@@ -0,0 +1,8 @@
+"""Shared fixtures for Barcode Router tests."""
+from __future__ import annotations
+
+import os
+import sys
+
+# Make custom_components importable without installing the integration
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,235 @@
+"""Request counts of the Grocy backend."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.barcode_router.backends.grocy import GrocyBackend
+from custom_components.barcode_router.batch_manager import BatchItem
+from custom_components.barcode_router.outbox import STATE_UNCERTAIN, Outbox
+
+GROCY_URL = "http://grocy.local"
+
+# The outbox only needs Home Assistant for its store, which these tests do not save
+HASS = SimpleNamespace()
+
+PRODUCT = {"id": 7, "name": "Oat Milk", "description": "", "qu_id_purchase": 2}
+
+
+class FakeResponse:
+    """Minimal aiohttp response."""
+
+    def __init__(self, status: int, payload: Any) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.content_type = "application/json"
+        self._payload = payload
+
+    async def __aenter__(self) -> FakeResponse:
+        """Enter the response context."""
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        """Leave the response context."""
+
+    def raise_for_status(self) -> None:
+        """Raise nothing; the fake only answers 200 and 404."""
+
+    async def json(self) -> Any:
+        """Return the payload."""
+        return self._payload
+
+
+class FakeGrocy:
+    """Session manager whose session answers like a Grocy with one product."""
+
+    def __init__(self) -> None:
+        """Initialize the fake."""
+        self.requests: list[tuple[str, str]] = []
+        self.payloads: list[Any] = []
+        self.session = self
+        self.timeout = False
+        self.timeout_after_creating = False
+        self.products = [PRODUCT]
+        self.changes = 0
+
+    def request(self, method: str, url: str, **kwargs: Any) -> FakeResponse:
+        """Record a request and answer it."""
+        endpoint = url.removeprefix(f"{GROCY_URL}/api")
+        self.requests.append((method, endpoint))
+        self.payloads.append(kwargs.get("json"))
+        if self.timeout:
+            raise asyncio.TimeoutError
+        if method == "POST":
+            self.changes += 1
+            if endpoint == "/objects/products":
+                self.products.append({**kwargs["json"], "id": 8})
+                if self.timeout_after_creating:
+                    # Grocy created the product but the answer never arrived
+                    self.timeout_after_creating = False
+                    raise asyncio.TimeoutError
+            return FakeResponse(200, {"created_object_id": 8})
+        answers = {
+            "/system/db-changed-time": {"changed_time": f"2024-01-01 00:00:{self.changes:02d}"},
+            "/objects/products": self.products,
+            "/objects/product_barcodes": [{"product_id": 7, "barcode": "4006381333931"}],
+            "/objects/quantity_units": [{"id": 2, "name": "Carton"}],
+        }
+        if endpoint in answers:
+            return FakeResponse(200, answers[endpoint])
+        return FakeResponse(404, None)
+
+
+async def _scan_and_process(barcode: str, upc_data: dict[str, Any]) -> list[tuple[str, str]]:
+    """Scan and process one barcode with a warm product index.
+
+    Returns:
+        The requests sent for the scan and the processing
+    """
+    grocy = FakeGrocy()
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+    assert await backend._async_sync_index(60)
+    grocy.requests.clear()
+
+    item_info = await backend.resolve_item(barcode)
+    item = BatchItem(
+        {
+            "barcode": barcode,
+            "upc_data": upc_data,
+            "backend": "grocy",
+            "exists": item_info is not None,
+            "item_info": item_info,
+        }
+    )
+    results = await backend.process_items([item], asyncio.Semaphore(1))
+    assert results[0]["success"]
+    return grocy.requests
+
+
+def test_existing_item_costs_one_request() -> None:
+    """An existing product is resolved from the index and booked by id."""
+    requests = asyncio.run(_scan_and_process("4006381333931", {"title": "Oat Milk"}))
+
+    assert requests == [("POST", "/stock/products/7/add")]
+
+
+def test_new_item_costs_three_requests() -> None:
+    """A new product is created, linked to its barcode and stocked."""
+    requests = asyncio.run(_scan_and_process("5000112637922", {"title": "Cola"}))
+
+    assert requests == [
+        ("POST", "/objects/products"),
+        ("POST", "/objects/product_barcodes"),
+        ("POST", "/stock/products/8/add"),
+    ]
+
+
+def test_cold_index_loads_once() -> None:
+    """Concurrent scans share one index load."""
+    grocy = FakeGrocy()
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+
+    async def _scan_twice() -> None:
+        await asyncio.gather(
+            backend.resolve_item("4006381333931"), backend.resolve_item("4006381333931")
+        )
+
+    asyncio.run(_scan_twice())
+
+    assert len(grocy.requests) == 4
+
+
+def test_new_items_sharing_a_name_are_not_merged() -> None:
+    """Only the first of two new barcodes with the same title is created."""
+    grocy = FakeGrocy()
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+    items = [
+        BatchItem({"barcode": barcode, "upc_data": {"title": "Cola"}, "backend": "grocy"})
+        for barcode in ("5000112637922", "5449000000996")
+    ]
+
+    results = asyncio.run(backend.process_items(items, asyncio.Semaphore(2)))
+
+    assert results[0]["success"]
+    assert not results[1]["success"]
+    assert "combined_with" not in results[0]
+    assert grocy.requests.count(("POST", "/objects/product_barcodes")) == 1
+
+
+def test_new_item_is_linked_as_scanned() -> None:
+    """A UPC-A scan is linked in Grocy as scanned, not in its canonical form."""
+    grocy = FakeGrocy()
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+    item = BatchItem(
+        {
+            "barcode": "0036000291452",
+            "scanned_barcode": "036000291452",
+            "upc_data": {"title": "Tissues"},
+            "backend": "grocy",
+        }
+    )
+
+    asyncio.run(backend.process_items([item], asyncio.Semaphore(1)))
+
+    link = grocy.payloads[grocy.requests.index(("POST", "/objects/product_barcodes"))]
+    assert link["barcode"] == "036000291452"
+
+
+def test_outage_is_not_reported_as_a_new_item() -> None:
+    """A timeout raises instead of resolving to None, and is not retried."""
+    grocy = FakeGrocy()
+    grocy.timeout = True
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(backend.resolve_item("4006381333931"))
+
+    assert grocy.requests == [("GET", "/system/db-changed-time")]
+
+
+def test_timed_out_creation_is_uncertain() -> None:
+    """A creation that may have reached Grocy is not marked for a blind retry."""
+    grocy = FakeGrocy()
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+    item = BatchItem({"barcode": "5000112637922", "upc_data": {"title": "Cola"}, "backend": "grocy"})
+
+    async def _process() -> list[dict[str, Any]]:
+        assert await backend._async_sync_index(60)
+        grocy.timeout = True
+        return await backend.process_items([item], asyncio.Semaphore(1))
+
+    result = asyncio.run(_process())[0]
+
+    assert result["uncertain"]
+    assert "retryable" not in result
+    assert grocy.requests[-1] == ("POST", "/objects/products")
+
+
+def test_uncertain_creation_is_finished_not_repeated() -> None:
+    """A product created by a timed-out POST gets its barcode and stock, not a twin."""
+    grocy = FakeGrocy()
+    grocy.timeout_after_creating = True
+    backend = GrocyBackend({"url": GROCY_URL, "api_key": "key"}, grocy)
+    item = BatchItem({"barcode": "5000112637922", "upc_data": {"title": "Cola"}, "backend": "grocy"})
+    outcomes: list[dict[str, Any]] = []
+    outbox = Outbox(
+        HASS, {"grocy": backend}, handler=None, on_outcome=lambda _, result: outcomes.append(result)
+    )
+
+    async def _process_and_settle() -> bool:
+        result = (await backend.process_items([item], asyncio.Semaphore(1)))[0]
+        assert result["uncertain"]
+        entry = {"key": "grocy:5000112637922", "item": item.to_dict(), "state": STATE_UNCERTAIN}
+        outbox._entries[entry["key"]] = entry
+        return await outbox._async_settle_uncertain(entry)
+
+    assert asyncio.run(_process_and_settle())
+
+    assert outcomes[0]["success"]
+    assert [product["name"] for product in grocy.products].count("Cola") == 1
+    assert grocy.requests.count(("POST", "/objects/products")) == 1
+    assert ("POST", "/objects/product_barcodes") in grocy.requests
+    assert ("POST", "/stock/products/8/add") in grocy.requests